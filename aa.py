@@ -1,112 +1,102 @@
-import osmnx as ox
-import networkx as nx
-import pygame
+import os
 import random
+import time
+
 import numpy as np
 
-# Simülasyon ve trafik grafiği oluşturma
+from trafficsim.graph_loader import load_graph
+from trafficsim.qtable import QTable
+from trafficsim.rl import parallel_rollouts, reward_function
+from trafficsim.road_graph import RoadGraph
+
 center_point = (40.759348, 30.363582)  # Serdivan'a yakın bir koordinat
 radius = 1250  # 1250 metre
-graph = ox.graph_from_point(center_point, dist=radius, network_type='all')
-graph = ox.truncate.largest_component(graph)
-
-# Trafik yoğunluğu hesaplayıcı
-def calculate_traffic_density(agents):
-    traffic_density = reset_traffic_density()
-    for agent in agents:
-        if agent.path and len(agent.path) > 1:
-            edge = (agent.position, agent.path[1], 0)
-            if edge in traffic_density:
-                traffic_density[edge] += 1
-    return sum(traffic_density.values())
 
 # RL Parametreleri
 alpha = 0.1  # Öğrenme hızı
 gamma = 0.9  # İndirim faktörü
 epsilon = 0.1  # Epsilon-greedy araştırma/sömürü oranı
 episodes = 500_000  # Episode sayısı
-
-# Trafik ışıklarının yoğunluğu azaltıp azaltmadığına bağlı olarak ödül fonksiyonu
-def reward_function(initial_density, final_density):
-    if final_density < initial_density:
-        reward = (initial_density - final_density) / initial_density * 100  # Yüzde ödül
-    else:
-        reward = -10  # Trafik artarsa ceza
-    return reward
-
-# Q-learning yapısı
-Q_table = {}  # Q tablosunu başlangıçta boş olarak başlatıyoruz
-
-# Trafik yoğunluğu sıfırlama
-def reset_traffic_density():
-    return {edge: 0 for edge in graph.edges(keys=True)}
-
-# Trafik ışıklarını rastgele koymak için aday kenarları belirliyoruz
-def get_random_light_locations():
-    return random.sample(list(graph.nodes), 15)  # 15 rastgele düğüm seçiyoruz
-
-# Ajan sınıfı (Araçlar)
-class Agent:
-    def __init__(self, graph):
-        self.graph = graph
-        self.position = random.choice(list(graph.nodes))
-        self.path = None
-        self.speed = random.uniform(1, 2)
-
-    def move(self):
-        if not self.path:
-            while True:
-                target = random.choice(list(self.graph.nodes))
-                try:
-                    self.path = nx.shortest_path(self.graph, self.position, target)
-                    break
-                except nx.NetworkXNoPath:
-                    continue
-        
-        if len(self.path) > 1:
-            next_position = self.path[1]
-            self.position = next_position
-            self.path.pop(0)
-
-# Trafik ışıklarını simüle eden RL ajanı
-def run_rl_simulation(traffic_lights):
-    agents = [Agent(graph) for _ in range(550)]  # Ajan oluştur
-    initial_density = calculate_traffic_density(agents)  # Başlangıç yoğunluğu
-    final_density = calculate_traffic_density(agents)  # Trafik ışıklarıyla oluşan yoğunluk
-    return initial_density, final_density
-
-# Q-learning döngüsü
-for episode in range(episodes):
-    # Trafik ışıkları için rastgele bir state (durum) seç
-    current_state = tuple(get_random_light_locations())
-
-    # Q-table girişlerini kontrol et, yoksa başlat
-    if current_state not in Q_table:
-        Q_table[current_state] = np.zeros(2)  # İki aksiyon: 0 = ışık koyma, 1 = ışık koyma
-    
-    # Epsilon-greedy strateji
-    if random.uniform(0, 1) < epsilon:
-        action = random.choice([0, 1])  # Rastgele aksiyon
+horizon = 50  # Her episode'da simüle edilen tick sayısı
+batch_size = 32  # Bir partide birlikte simüle edilen aday yerleşim sayısı
+num_lights = 15  # Yerleşim başına ışık sayısı
+q_capacity = 1 << 18  # Q tablosunda tutulan en fazla durum sayısı (bellek sabit kalır)
+workers = os.cpu_count()  # Rollout üreten aktör süreci sayısı (0: aynı süreçte)
+checkpoint_path = "q_table.npz"  # Q tablosu kontrol noktası
+checkpoint_every = 50_000  # Kaç episode'da bir kontrol noktası yazılacağı (parti sınırında)
+seed = 0
+
+
+# Trafik ışıklarını rastgele koymak için aday düğümleri belirliyoruz (yoğun indeksler)
+def get_random_light_locations(road):
+    return random.sample(range(road.num_nodes), num_lights)  # 15 rastgele düğüm seçiyoruz
+
+
+def main():
+    # Simülasyon ve trafik grafiği oluşturma
+    graph = load_graph(center_point, radius, network_type='all', largest_component='weak')
+
+    # Simülasyonda kullanılan dizi tabanlı graf görünümü
+    road = RoadGraph.from_networkx(graph)
+
+    # Q-learning yapısı: durumlar sıralı düğüm indeksleriyle, önceden ayrılmış sabit boyutlu
+    # tabloda (iki aksiyon: 0 = ışık koyma, 1 = ışık koy); tabloda olmayan durumun değerleri sıfırdır.
+    # Kontrol noktası varsa eğitim kaldığı episode'dan devam eder.
+    start_episode = 0
+    if os.path.exists(checkpoint_path):
+        Q_table, meta = QTable.load(checkpoint_path)
+        start_episode = int(meta["episode"])
+        print(f"Kontrol noktasından devam ediliyor: episode {start_episode}")
     else:
-        action = np.argmax(Q_table[current_state])  # En iyi aksiyonu seç
-    
-    # Simülasyonu aksiyona göre çalıştır
-    initial_density, final_density = run_rl_simulation(current_state)
-
-    # Ödül hesapla
-    reward = reward_function(14596, final_density)  # Sabit trafik ışığı olmadan yoğunluk = 14596
-    
-    # Q-learning güncelleme
-    next_state = tuple(get_random_light_locations())  # Bir sonraki rastgele durum
-    if next_state not in Q_table:
-        Q_table[next_state] = np.zeros(2)  # İki aksiyon
-    best_next_action = np.argmax(Q_table[next_state])
-
-    Q_table[current_state][action] += alpha * (reward + gamma * Q_table[next_state][best_next_action] - Q_table[current_state][action])
-
-    if episode % 1000 == 0:
-        print(f"Episode: {episode}, Reward: {reward}")
-
-# En iyi ışık yerleşimlerini bul ve göster
-best_state = max(Q_table, key=lambda state: np.max(Q_table[state]))
-print(f"En iyi trafik ışığı yerleşimleri: {best_state}")
+        Q_table = QTable(num_lights, num_actions=2, capacity=q_capacity)
+
+    # Q-learning döngüsü (öğrenici): aktör süreçleri partiler hâlinde rastgele yerleşimleri
+    # simüle eder (550 ajanlık havuz her partide yeniden kullanılır, her aday ve ışıksız
+    # karşılaştırma aynı başlangıçtan simüle edilir); öğrenici aksiyonu seçip Q tablosunu günceller
+    started = time.perf_counter()
+    episode = start_episode
+    rollouts = parallel_rollouts(road, episodes, workers=workers, batch_size=batch_size, num_lights=num_lights,
+                                 seed=seed, start=start_episode, num_agents=550, horizon=horizon)
+    for states, baseline_density, light_densities in rollouts:
+        for current_state, final_density in zip(states, light_densities.tolist()):
+            current_values = Q_table.get(current_state)
+
+            # Epsilon-greedy strateji
+            if random.uniform(0, 1) < epsilon:
+                action = random.choice([0, 1])  # Rastgele aksiyon
+            else:
+                action = int(np.argmax(current_values))  # En iyi aksiyonu seç
+
+            # Ödül hesapla: ışık konmazsa yoğunluk ışıksız çalıştırmayla aynıdır
+            if action == 1:
+                reward = reward_function(baseline_density, final_density)
+            else:
+                reward = reward_function(baseline_density, baseline_density)
+
+            # Q-learning güncelleme
+            next_state = get_random_light_locations(road)  # Bir sonraki rastgele durum
+            best_next_value = Q_table.max_value(next_state)
+
+            value = current_values[action]
+            Q_table.set(current_state, action, value + alpha * (reward + gamma * best_next_value - value))
+
+            if episode % 1000 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"Episode: {episode}, Reward: {reward}, {(episode - start_episode) / elapsed if elapsed else 0.0:.1f} episode/s")
+            episode += 1
+
+        if (episode - len(states)) // checkpoint_every != episode // checkpoint_every or episode == episodes:
+            Q_table.save(checkpoint_path, episode=episode)
+
+    print(f"{episode - start_episode} episode, {(episode - start_episode) / (time.perf_counter() - started):.1f} episode/s")
+    print(f"Q tablosu: {len(Q_table)} durum, {Q_table.evictions} atılan, {Q_table.nbytes / 1e6:.1f} MB")
+
+    # En iyi ışık yerleşimlerini göster (tablo en iyi durumu güncel tutar, tarama yok; OSM düğüm kimlikleriyle)
+    best_state, best_values = Q_table.best()
+    print(f"En iyi trafik ışığı yerleşimleri: {tuple(road.osm_id(best_state).tolist())}")
+
+
+# Aktör süreçleri (spawn başlatma yönteminde) bu modülü yeniden içe aktarır; eğitim
+# yalnızca betik doğrudan çalıştırıldığında başlar
+if __name__ == "__main__":
+    main()
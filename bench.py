@@ -0,0 +1,301 @@
+import time
+
+STARTED = time.perf_counter()  # başlangıç süresi, ağır içe aktarmalar dahil buradan ölçülür
+
+import argparse  # noqa: E402
+import glob  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import platform  # noqa: E402
+import resource  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+# Çevrimdışı performans ölçüm takımı. Her ölçüm ayrı bir alt süreçte çalışır, böylece
+# tepe bellek (RSS) ve başlangıç süresi ölçümler arasında karışmaz. Graflar
+# cache/*.json altındaki Overpass yanıtlarından (ağ erişimi ve ekran gerekmez) ya da
+# synthetic.py'deki ızgara/radyal üreteçlerinden gelir. Sonuçlar JSON olarak yazılır;
+# `python bench.py compare eski.json yeni.json` iki sürüm arasındaki gerilemeleri listeler.
+#
+#   ticks    -> AgentPopulation.step döngüsü (tick/s), başlangıç süresi ve tepe RSS
+#   routing  -> en kısa yol sorguları (sorgu/s): BFS, 'length' Dijkstra, yol ağacı kipi
+#   density  -> DensityAccumulator.add maliyeti (tick/s)
+#   signals  -> SignalPlan.update (güncelleme/s)
+BENCHMARKS = ("ticks", "routing", "density", "signals")
+AGENT_COUNTS = (100, 550, 10_000, 100_000)
+SYNTHETIC_SIZES = (1_000, 10_000, 50_000, 200_000)
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Karşılaştırmada büyüklüğü iyi olan metrikler (diğerleri için küçüğü iyidir)
+HIGHER_IS_BETTER = ("ticks_per_s", "queries_per_s", "updates_per_s")
+
+
+def cached_cities(cache_folder=CACHE_FOLDER):
+    return sorted(os.path.basename(path)[:-5] for path in glob.glob(os.path.join(cache_folder, "*.json")))
+
+
+# Graf tanımı: "city:<önbellek dosyası>", "grid:<düğüm>" ya da "radial:<düğüm>"
+def load_road(spec):
+    kind, _, arg = spec.partition(":")
+    if kind == "city":
+        from trafficsim import graph_loader
+        from trafficsim.road_graph import RoadGraph
+
+        with open(os.path.join(CACHE_FOLDER, arg + ".json"), encoding="utf-8") as f:
+            response = json.load(f)
+        # Betiklerdeki gibi kırpılmış, sadeleştirilmiş ve en büyük bileşenle sınırlı graf;
+        # merkez ve yarıçap yanıtın kapsamından (500 m tampon düşülerek) bulunur
+        elements = response["elements"]
+        west, south, east, north = graph_loader._response_extent(elements)
+        center_point = ((south + north) / 2, (west + east) / 2)
+        radius = max(_extent_radius(center_point, west, south, east, north) - 500, 100)
+        graph = graph_loader.build_graph(response, center_point, radius,
+                                         graph_loader._response_network_type(elements), "weak")
+        return RoadGraph.from_networkx(graph)
+    from trafficsim.synthetic import grid_graph, radial_graph
+
+    if kind == "grid":
+        return grid_graph(int(arg))
+    if kind == "radial":
+        return radial_graph(int(arg))
+    raise ValueError(f"Unrecognized graph spec {spec!r}")
+
+
+# Kapsam kutusuna sığan en büyük yarıçap (metre), _bbox_from_point'in tersi
+def _extent_radius(center_point, west, south, east, north):
+    earth_radius = 6_371_009
+    lat = center_point[0]
+    half_lat = (north - south) / 2 * np.pi / 180 * earth_radius
+    half_lon = (east - west) / 2 * np.pi / 180 * earth_radius * np.cos(lat * np.pi / 180)
+    return min(half_lat, half_lon)
+
+
+# `fn` en az bir kez ve toplam `budget` saniye dolana kadar çağrılır; (çağrı, saniye)
+def _timed(fn, budget, limit=None):
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget or (limit is not None and calls >= limit):
+            return calls, elapsed
+
+
+# Hedefine varan ajanlara bir sonraki tick'te yeni hedef atanır; böylece ölçüm boyunca
+# ajan sayısı kadar araç yolda kalır (yoksa birkaç yüz tick'te herkes varır ve boş
+# tick'ler ölçülür)
+def bench_ticks(road, agents, budget, max_ticks=300):
+    from trafficsim.agents import AgentPopulation
+    from trafficsim.engine import Simulation
+
+    population = AgentPopulation(road, agents, rng=0)
+    simulation = Simulation(road, population, with_traffic_lights=False)
+    first = time.perf_counter()
+    simulation.step()  # ilk tick: tüm ajanlara hedef ve rota atanır
+    first_tick = time.perf_counter() - first
+    ready = time.perf_counter() - STARTED
+    active = []
+
+    def tick():
+        arrived = population.reached & (population.paths.length > 0)
+        population.target[arrived] = -1
+        population.reached[arrived] = False
+        simulation.step()
+        active.append(np.count_nonzero(population.next_node >= 0))
+
+    ticks, elapsed = _timed(tick, budget, max_ticks)
+    return {"startup_s": ready, "first_tick_s": first_tick, "ticks": ticks,
+            "ticks_per_s": ticks / elapsed, "mean_active_agents": float(np.mean(active)),
+            "density_total": simulation.accumulator.total}
+
+
+def bench_routing(road, budget, queries=2000):
+    from trafficsim.reachability import shared_sampler
+    from trafficsim.routing import Router
+
+    rng = np.random.default_rng(0)
+    sampler = shared_sampler(road)
+    sources = rng.integers(0, road.num_nodes, queries)
+    pairs = [(int(s), sampler.sample(int(s), rng)) for s in sources.tolist()]
+    pairs = [(s, t) for s, t in pairs if t >= 0]
+    result = {}
+    for name, mode, weight in (("bfs", "pair", None), ("dijkstra", "pair", "length"), ("tree", "tree", None)):
+        router = Router(road, mode=mode, max_trees=road.num_nodes)
+        started = time.perf_counter()
+        done = 0
+        for source, target in pairs:
+            router.route(source, target, weight)
+            done += 1
+            if time.perf_counter() - started >= budget:
+                break
+        result[f"{name}_queries_per_s"] = done / (time.perf_counter() - started)
+    return result
+
+
+def bench_density(road, agents, budget, max_ticks=10_000):
+    from trafficsim.density import DensityAccumulator
+
+    rng = np.random.default_rng(0)
+    edges = rng.integers(0, road.num_edges, agents).astype(np.int32)
+    result = {}
+    for name, history in (("plain", 0), ("history", 100)):
+        accumulator = DensityAccumulator(road.num_edges, history=history)
+        ticks, elapsed = _timed(lambda: accumulator.add(edges), budget, max_ticks)
+        result[f"{name}_ticks_per_s"] = ticks / elapsed
+    return result
+
+
+def bench_signals(lights, budget, max_ticks=100_000):
+    from trafficsim.signals import SignalPlan
+
+    rng = np.random.default_rng(0)
+    plan = SignalPlan(range(lights), rng.integers(5, 30, lights), rng.integers(5, 30, lights),
+                      rng.integers(0, 60, lights))
+    ticks, elapsed = _timed(plan.update, budget, max_ticks)
+    return {"updates_per_s": ticks / elapsed, "light_updates_per_s": ticks * lights / elapsed}
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KiB, macOS'ta bayt
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Tek bir ölçüm (alt süreçte çalışır)
+def run_case(case, budget):
+    benchmark = case["benchmark"]
+    if benchmark == "signals":
+        result = bench_signals(case["lights"], budget)
+    else:
+        road = load_road(case["graph"])
+        case = dict(case, nodes=road.num_nodes, edges=road.num_edges)
+        if benchmark == "ticks":
+            result = bench_ticks(road, case["agents"], budget)
+        elif benchmark == "routing":
+            result = bench_routing(road, budget)
+        elif benchmark == "density":
+            result = bench_density(road, case["agents"], budget)
+        else:
+            raise ValueError(f"Unrecognized benchmark {benchmark!r}")
+    result["peak_rss_mb"] = peak_rss_mb()
+    return dict(case, **result)
+
+
+def case_id(case):
+    parts = [case["benchmark"], case.get("graph", "")]
+    for key in ("agents", "lights"):
+        if key in case:
+            parts.append(f"{key}={case[key]}")
+    return "/".join(part for part in parts if part)
+
+
+def default_cases(quick=False):
+    cities = cached_cities()
+    sizes = SYNTHETIC_SIZES[:2] if quick else SYNTHETIC_SIZES
+    counts = AGENT_COUNTS[:3] if quick else AGENT_COUNTS
+    graphs = [f"city:{city}" for city in (cities[:1] if quick else cities)]
+    graphs += [f"{kind}:{n}" for kind in ("grid", "radial") for n in sizes]
+    cases = []
+    # Ajan ölçeklemesi küçük bir şehir ve orta boy ızgara üzerinde
+    for graph in [f"city:{cities[0]}", "grid:10000"][:1 if quick else 2]:
+        cases += [{"benchmark": "ticks", "graph": graph, "agents": n} for n in counts]
+    cases += [{"benchmark": "routing", "graph": graph} for graph in graphs]
+    cases += [{"benchmark": "density", "graph": f"grid:{sizes[-1]}", "agents": n} for n in counts]
+    cases += [{"benchmark": "signals", "lights": n} for n in (15, 1_000, 100_000)]
+    return cases
+
+
+def _meta():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ""
+    return {"revision": revision, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+# Tüm ölçümleri ayrı alt süreçlerde çalıştırıp sonuçları `out` dosyasına yaz
+def run_suite(cases, out, budget, only=None):
+    results = []
+    for case in cases:
+        if only and case["benchmark"] not in only:
+            continue
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "case", json.dumps(case),
+                               "--budget", str(budget)], capture_output=True, text=True)
+        if proc.returncode != 0:
+            result = dict(case, error=proc.stderr.strip().splitlines()[-1:])
+        else:
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["id"] = case_id(case)
+        result["wall_s"] = time.perf_counter() - started
+        results.append(result)
+        print(f"{result['id']}: {_summary(result)}", flush=True)
+    with open(out, "w") as f:
+        json.dump({"meta": _meta(), "results": results}, f, indent=2)
+    return results
+
+
+def _summary(result):
+    if "error" in result:
+        return f"HATA {result['error']}"
+    keys = [key for key in result if key.endswith("_per_s") or key in ("startup_s", "peak_rss_mb")]
+    return ", ".join(f"{key}={result[key]:.4g}" for key in keys)
+
+
+# İki sonuç dosyasını karşılaştır; `threshold` oranından kötüleşen metrikleri döndür
+def compare(base_path, new_path, threshold=0.1):
+    with open(base_path) as f:
+        base = {r["id"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["id"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for case, result in new.items():
+        old = base.get(case)
+        if old is None:
+            continue
+        for key, value in result.items():
+            if not (key.endswith("_per_s") or key in ("startup_s", "peak_rss_mb")) or key not in old:
+                continue
+            if not old[key]:
+                continue
+            ratio = value / old[key]
+            worse = ratio < 1 - threshold if key.endswith(HIGHER_IS_BETTER) else ratio > 1 + threshold
+            print(f"{'GERİLEME ' if worse else ''}{case} {key}: {old[key]:.4g} -> {value:.4g} ({ratio:.2f}x)")
+            if worse:
+                regressions.append((case, key, old[key], value))
+    return regressions
+
+
+# Kullanım:
+#   python bench.py run [--quick] [--out bench_results.json] [--only ticks,routing]
+#   python bench.py compare eski.json yeni.json [--threshold 0.1]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("--quick", action="store_true")
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--only", default="")
+    run_parser.add_argument("--budget", type=float, default=None)
+    case_parser = sub.add_parser("case")
+    case_parser.add_argument("case")
+    case_parser.add_argument("--budget", type=float, default=2.0)
+    compare_parser = sub.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "case":
+        print(json.dumps(run_case(json.loads(args.case), args.budget)))
+    elif args.command == "run":
+        budget = args.budget if args.budget is not None else (0.5 if args.quick else 2.0)
+        only = [name for name in args.only.split(",") if name]
+        run_suite(default_cases(args.quick), args.out, budget, only)
+    else:
+        sys.exit(1 if compare(args.base, args.new, args.threshold) else 0)
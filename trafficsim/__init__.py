@@ -0,0 +1,55 @@
+import importlib
+
+# Simülasyonun ortak parçalarını tek bir paketten sunar: `import trafficsim` hiçbir
+# alt modülü yüklemez ve hiçbir iş yapmaz; bir ad ilk kullanıldığında yalnızca tanımlandığı
+# alt modül içe aktarılır (PEP 562). Depo kökünde yalnızca çalıştırılan betikler durur;
+# sweep ve density_store `python -m trafficsim.<modül>` ile çalıştırılır.
+# osmnx yalnızca ağdan graf indirilirken (graph_loader), pygame yalnızca PygameView
+# açılınca, matplotlib yalnızca tl.py/tl2.py çizimlerinde, networkx yalnızca graf
+# yüklenirken/kurulurken içe aktarılır; süreç havuzu işçileri (rl, sweep) bunların
+# hiçbirini yüklemez.
+_EXPORTS = {
+    # Graf yükleme
+    "load_graph": "graph_loader",
+    "load_snapshot": "graph_loader",
+    "traffic_signal_nodes": "graph_loader",
+    "RoadGraph": "road_graph",
+    "scale_coordinates": "road_graph",
+    "grid_graph": "synthetic",
+    "radial_graph": "synthetic",
+    # Işıklar
+    "TrafficLight": "signals",
+    "SignalPlan": "signals",
+    "CycleController": "controllers",
+    # Ajanlar ve yönlendirme
+    "Agent": "agents",
+    "AgentPopulation": "agents",
+    "Router": "routing",
+    "shared_router": "routing",
+    # Motorlar
+    "Simulation": "engine",
+    "EventSimulation": "events",
+    "MesoSimulation": "meso",
+    # Yoğunluk
+    "DensityAccumulator": "density",
+    "reset_traffic_density": "density",
+    "compare_densities": "density",
+    # Görünüm ve ölçüm
+    "PygameView": "pygame_view",
+    "Profiler": "profiling",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # sonraki erişimler modül sözlüğünden okunur
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,266 @@
+import weakref
+
+import numpy as np
+
+from .collision import COLLISION_MODES, GridHash, leader_blocked
+from .path_pool import PathPool
+from .reachability import shared_sampler
+from .road_graph import RoadGraph
+from .routing import shared_router
+from .signals import SignalPlan
+
+# Hareket kipleri:
+#   "hop"         -> tl1.py/hayat.py: her adımda bir sonraki düğüme atlanır
+#   "interpolate" -> o1.py/o2.py: piksel konumu kenar boyunca `speed` kadar ilerler
+MODES = ("hop", "interpolate")
+
+
+# Ajan (araç) popülasyonu, dizi yapısında (structure-of-arrays) tutulur.
+# Her ajanın konumu, bir sonraki düğümü, hızı, hedefe ulaşma/bekleme durumları
+# ve piksel konumu ayrı NumPy dizilerindedir; rotalar ve yol imleçleri ortak
+# PathPool tamponundadır. step() tüm ajanları birlikte ilerletir.
+# Düğümler RoadGraph'ın yoğun indeksleridir.
+class AgentPopulation:
+    def __init__(self, road, count, mode="hop", weight=None, node_positions=None,
+                 speed_range=(1.0, 2.0), rng=None, route=None, routing="pair",
+                 min_hops=0, sampler=None, collision=None, gap=10.0, landmarks=None):
+        if mode not in MODES:
+            raise ValueError(f"Unrecognized mode {mode!r}")
+        if collision is not None and collision not in COLLISION_MODES:
+            raise ValueError(f"Unrecognized collision mode {collision!r}")
+        self.road = road
+        self.mode = mode
+        self.weight = weight
+        self.speed_range = speed_range
+        self.rng = np.random.default_rng(rng)
+        self.paths = PathPool(count)
+        if node_positions is None:
+            node_positions = road.pixel_positions(800)
+        self.node_positions = np.asarray(node_positions, dtype=np.float64)
+        self.router = None
+        if route is None:
+            # Varsayılan olarak süreç genelinde paylaşılan önbellekli yönlendirici; landmarks
+            # (landmarks.LandmarkIndex) verilirse weight='length' sorguları ALT ile çözülür
+            options = {} if landmarks is None else {"landmarks": landmarks}
+            router = self.router = shared_router(road, mode=routing, **options)
+            route = lambda s, t: router.route(s, t, weight)  # noqa: E731
+        self.route = route
+        self.min_hops = min_hops
+        # "interpolate" kipinde araçlar arası en az mesafe (piksel) kontrolü
+        self.collision = collision
+        self.gap = gap
+        self.grid = GridHash(gap) if collision == "radius" else None
+        self.sampler = sampler if sampler is not None else shared_sampler(road)
+        self.profiler = None  # Simulation bir profiling.Profiler bağlarsa fazlar ölçülür
+        self.reset(count)
+
+    def __len__(self):
+        return len(self.position)
+
+    # positions verilirse ajanlar bu düğümlerden başlar (ör. rl.py'de her blokta aynı başlangıç)
+    def reset(self, count=None, positions=None):
+        if positions is not None:
+            count = len(positions)
+            self.position = np.asarray(positions, dtype=np.int32).copy()
+        else:
+            count = len(self) if count is None else count
+            self.position = self.rng.integers(0, self.road.num_nodes, count).astype(np.int32)
+        self.target = np.full(count, -1, dtype=np.int32)
+        self.next_node = np.full(count, -1, dtype=np.int32)
+        self.speed = self.rng.uniform(*self.speed_range, count)
+        self.reached = np.zeros(count, dtype=bool)
+        self.stuck_steps = np.zeros(count, dtype=np.int32)
+        self.moved = np.zeros(count, dtype=bool)  # son adımda hareket eden ajanlar
+        self.pos = self.node_positions[self.position].copy()
+        self.paths.reset(count)
+
+    # Henüz rotası olmayan ajanlara erişilebilir rastgele hedef ve en kısa yol ata;
+    # rota atanan ajan sayısını döndürür
+    def assign_routes(self):
+        pending = np.flatnonzero(self.target < 0).tolist()
+        for i in pending:
+            source = int(self.position[i])
+            target = self.sampler.sample(source, self.rng, self.min_hops)
+            path = None if target < 0 else self.route(source, target)
+            if path is None:
+                # Kaynaktan koşulu sağlayan erişilebilir hedef yok, ajan yerinde kalır
+                self.target[i] = source
+                self.reached[i] = True
+                continue
+            self.paths.assign(i, path)
+            self.target[i] = target
+            self.next_node[i] = path[1]
+        return len(pending)
+
+    # Hazır rotaları toplu ata (ör. rl.py'de tüm bloklara aynı rotalar). Rotalar `flat`
+    # içinde art arda, her biri ajanın bulunduğu düğümle başlar; tek düğümlük rota
+    # ajanın yerinde kalacağı anlamına gelir.
+    def assign_paths(self, agents, flat, lengths):
+        agents = np.asarray(agents, dtype=np.int64)
+        flat = np.asarray(flat, dtype=np.int32)
+        lengths = np.asarray(lengths, dtype=np.int32)
+        self.paths.assign_flat(agents, flat, lengths)
+        starts = np.cumsum(lengths, dtype=np.int64) - lengths
+        routed = lengths > 1
+        self.target[agents] = flat[starts + lengths - 1]
+        self.next_node[agents] = np.where(routed, flat[np.minimum(starts + 1, len(flat) - 1)], -1)
+        self.reached[agents[~routed]] = True
+
+    # Yol imleci ilerleyen ajanların bir sonraki düğümünü rota tamponundan oku
+    def _advance(self, moved):
+        self.paths.advance(moved)
+        self.next_node[moved] = self.paths.next_node(moved)
+        arrived = moved & (self.next_node < 0)
+        self.reached |= arrived
+
+    # Kırmızı ışık nedeniyle bekleyecek ajanlar: düğüm bazlı (tl1) ya da şerit bazlı (o2) ışıklar
+    def _held(self, active, node_red, edge_red):
+        held = np.zeros(len(self), dtype=bool)
+        if node_red is not None:
+            held[active] |= node_red[self.next_node[active]]
+        if edge_red is not None:
+            edges = self.road.edge_ids(self.position[active], self.next_node[active])
+            held[active] |= edge_red[edges]
+        return held
+
+    # Bir sonraki düğümü olan ajanların bulunduğu kenarların kimlikleri
+    def current_edges(self):
+        active = self.next_node >= 0
+        return self.road.edge_ids(self.position[active], self.next_node[active])
+
+    # Tüm ajanları bir adım ilerletir; bu adımda yoğunluğa sayılacak kenar kimliklerini döndürür
+    def step(self, node_red=None, edge_red=None):
+        routed = self.assign_routes()
+        if self.profiler is not None:
+            self.profiler.lap("routing")
+            self.profiler.count("routes_assigned", routed)
+        if self.mode == "hop":
+            return self._step_hop(node_red, edge_red)
+        return self._step_interpolate(node_red, edge_red)
+
+    def _step_hop(self, node_red, edge_red):
+        active = (self.next_node >= 0) & ~self.reached
+        held = self._held(active, node_red, edge_red)
+        moved = active & ~held
+        self.moved = moved
+        self.stuck_steps[held] += 1
+        self.stuck_steps[moved] = 0
+
+        self.position[moved] = self.next_node[moved]
+        self.pos[moved] = self.node_positions[self.position[moved]]
+        self._advance(moved)
+        # tl1.py'deki gibi yoğunluk hareketten sonraki kenar üzerinden sayılır
+        edges = self.current_edges()
+        if self.profiler is not None:
+            self.profiler.lap("movement")
+        return edges
+
+    # Işıkta beklemeyen ama önündeki araca çok yakın olduğu için duran ajanlar
+    def _blocked(self, active, candidates):
+        blocked = np.zeros(len(self), dtype=bool)
+        if self.collision == "edge":
+            # Aynı kenarda (şeritte) ilerleyen araçlar, kırmızıda bekleyenler dahil
+            others = np.flatnonzero(active)
+            edges = self.road.edge_ids(self.position[others], self.next_node[others])
+            delta = self.node_positions[self.next_node[others]] - self.pos[others]
+            remaining = np.hypot(delta[:, 0], delta[:, 1])
+            blocked[others] = leader_blocked(edges, remaining, self.pos[others], self.gap)
+        elif self.collision == "radius":
+            # Hedefe ulaşmamış tüm araçlar, hangi kenarda olursa olsun
+            others = np.flatnonzero(~self.reached)
+            blocked[others] = self.grid.build(self.pos[others]).crowded(self.gap)
+        return blocked & candidates
+
+    def _step_interpolate(self, node_red, edge_red):
+        active = (self.next_node >= 0) & ~self.reached
+        held = self._held(active, node_red, edge_red)
+        free = active & ~held
+        self.stuck_steps[held] += 1
+
+        # o2.py'deki gibi yoğunluk hareketten önceki kenar üzerinden sayılır;
+        # öndeki araç yüzünden duran araç da kenarında sayılır
+        edges = self.road.edge_ids(self.position[free], self.next_node[free])
+        if self.profiler is not None:
+            self.profiler.lap("movement")
+        moving = np.flatnonzero(free & ~self._blocked(active, free))
+        if self.profiler is not None:
+            self.profiler.lap("collision")
+        self.moved = np.zeros(len(self), dtype=bool)
+        self.moved[moving] = True
+
+        delta = self.node_positions[self.next_node[moving]] - self.pos[moving]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        speed = self.speed[moving]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            step = np.where(dist[:, None] != 0, delta * (speed / dist)[:, None], 0.0)
+        self.pos[moving] += step
+
+        # Düğüme yeterince yaklaşan ajanlar sonraki düğüme geçer
+        arrived = moving[dist < speed]
+        self.position[arrived] = self.next_node[arrived]
+        self.stuck_steps[arrived] = 0
+        mask = np.zeros(len(self), dtype=bool)
+        mask[arrived] = True
+        self._advance(mask)
+        if self.profiler is not None:
+            self.profiler.lap("movement")
+        return edges
+
+
+# Tek bir ajan (eski nesne tabanlı arayüz, tl1.py/hayat.py'nin ilk sürümleri):
+# networkx grafı üzerinde rastgele hedefe en kısa yoldan, her move() çağrısında bir
+# düğüm ilerler. Çok sayıda ajan için AgentPopulation kullanılır. `signals` düğüm
+# anahtarlı TrafficLight sözlüğü ya da SignalPlan olabilir. Hedef ve rota
+# AgentPopulation'daki gibi paylaşılan örnekleyici ve yönlendiriciden gelir (graf başına
+# bir kez kurulan RoadGraph üzerinde); koşulu sağlayan erişilebilir hedef yoksa ajan
+# yerinde kalır. Rota listesi değiştirilmez, `cursor` ajanın rotadaki yeridir.
+class Agent:
+    def __init__(self, graph, rng=None, min_path_length=0, road=None):
+        self.graph = graph
+        self.road = road if road is not None else _road_for(graph)
+        self.rng = np.random.default_rng(rng)
+        self.min_path_length = min_path_length  # tl1.py'nin ilk sürümünde 150 düğüm
+        self.position = self.road.osm_id(self.rng.integers(0, self.road.num_nodes))
+        self.path = None
+        self.cursor = 0
+        self.speed = self.rng.uniform(1, 2)  # Hız başlangıçta rastgele
+
+    def _new_path(self):
+        road = self.road
+        source = road.node_index(self.position)
+        target = shared_sampler(road).sample(source, self.rng, self.min_path_length)
+        path = None if target < 0 else shared_router(road).route(source, target)
+        if path is None:
+            return [self.position]  # Erişilebilir hedef yok, yerinde kal
+        return road.node_ids[path].tolist()
+
+    def move(self, signals=None):
+        if self.path is None:
+            self.path = self._new_path()
+            self.cursor = 0
+
+        if self.cursor + 1 < len(self.path):
+            # Sonraki düğüme hareket et
+            next_position = self.path[self.cursor + 1]
+
+            # Eğer trafik ışığında durması gerekiyorsa dur
+            if signals is not None and next_position in signals:
+                green = signals.is_green(next_position) if isinstance(signals, SignalPlan) \
+                    else signals[next_position].is_green()
+                if not green:
+                    return  # Hareket etme
+
+            # Ajanı bir düğüme taşı
+            self.position = next_position
+            self.cursor += 1
+
+
+_roads = weakref.WeakKeyDictionary()
+
+
+# networkx grafı başına tek RoadGraph görünümü (Agent'lar aynı grafı paylaşır)
+def _road_for(graph):
+    road = _roads.get(graph)
+    if road is None:
+        road = _roads[graph] = RoadGraph.from_networkx(graph)
+    return road
@@ -0,0 +1,70 @@
+import numpy as np
+
+# Çarpışma (araç takibi) kipleri:
+#   "edge"   -> o2.py: aynı kenardaki (u, v) araçlar kenar sonuna kalan mesafeye
+#               göre sıralı bir kuyrukta tutulur; her araç yalnızca önündeki
+#               araca (liderine) bakar
+#   "radius" -> o1.py: piksel konumları üzerinde düzgün ızgara karması; bir araç
+#               komşu hücrelerde `gap` pikselden yakın başka bir araç varsa bekler
+COLLISION_MODES = ("edge", "radius")
+
+
+# Kenar başına sıralı kuyruk: `edges` aynı kenarı paylaşan araçları gruplar,
+# `remaining` kenar sonuna kalan mesafedir. Sırada önündeki araç `gap`
+# pikselden yakınsa araç bekler. Eşit mesafede küçük indeksli araç öndedir.
+def leader_blocked(edges, remaining, pos, gap):
+    blocked = np.zeros(len(edges), dtype=bool)
+    if len(edges) < 2:
+        return blocked
+    order = np.lexsort((remaining, edges))
+    same_edge = edges[order[1:]] == edges[order[:-1]]
+    follower, leader = order[1:][same_edge], order[:-1][same_edge]
+    delta = pos[follower] - pos[leader]
+    blocked[follower] = np.hypot(delta[:, 0], delta[:, 1]) < gap
+    return blocked
+
+
+# Düzgün ızgara karması: noktalar `cell_size` kenarlı hücrelere dağıtılır ve
+# hücre anahtarına göre sıralanır; bir noktanın komşuları yalnızca çevresindeki
+# 3x3 hücrede aranır. Aynı piksel konumundaki noktalar (ör. aynı düğümde
+# bekleyen araçlar) tek nokta olarak dizinlenir ve sayıları tutulur.
+class GridHash:
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+
+    def _keys(self, cells):
+        # Hücre koordinatlarını tek bir int64 anahtara katla
+        return (cells[:, 0] << 32) + cells[:, 1]
+
+    def build(self, pos):
+        pos = np.asarray(pos, dtype=np.float64).reshape(-1, 2)
+        self.pos, self.inverse, self.counts = np.unique(pos, axis=0, return_inverse=True,
+                                                        return_counts=True)
+        self.inverse = self.inverse.reshape(-1)
+        self.cells = np.floor(self.pos / self.cell_size).astype(np.int64)
+        keys = self._keys(self.cells)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        return self
+
+    # Her nokta için `radius` pikselden (en fazla cell_size) yakın başka bir nokta var mı?
+    def crowded(self, radius):
+        # Aynı konumu paylaşan noktalar zaten birbirine çok yakın
+        result = self.counts > 1
+        points = np.flatnonzero(~result)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if len(points) == 0:
+                    break
+                keys = self._keys(self.cells[points] + (dx, dy))
+                start = np.searchsorted(self.sorted_keys, keys, side="left")
+                count = np.searchsorted(self.sorted_keys, keys, side="right") - start
+                # (nokta, aday) çiftlerini düz dizilere aç
+                pairs = np.repeat(points, count)
+                offsets = np.arange(len(pairs)) - np.repeat(np.cumsum(count) - count, count)
+                others = self.order[np.repeat(start, count) + offsets]
+                delta = self.pos[pairs] - self.pos[others]
+                close = (others != pairs) & (np.hypot(delta[:, 0], delta[:, 1]) < radius)
+                result[pairs[close]] = True
+                points = points[~result[points]]
+        return result[self.inverse]
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .signals import SignalPlan
+
+NO_CHANGES = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool))
+
+
+# Sinyal kontrolörü arayüzü: simülasyon her tick'te, ajanlar ilerlemeden önce
+# step(tick, sim) çağırır. observe(sim) kontrolörün ihtiyaç duyduğu durumu
+# simülasyondan kopyalar, decide(tick, observation) yalnızca durumu değişen
+# ışıkları (plan indeksleri, yeşil mi) döndürür; maliyet ışık sayısıyla değil
+# durum değişimleriyle ölçeklenir. Zaman duvar saatinden değil tick sayısından
+# gelir, bu yüzden ekransız hızlı çalıştırmalar da aynı sonucu verir.
+class SignalController:
+    def reset(self, sim):
+        pass
+
+    def observe(self, sim):
+        return None
+
+    def decide(self, tick, observation):
+        return NO_CHANGES
+
+    def step(self, tick, sim):
+        return self.decide(tick, self.observe(sim))
+
+    # Simulation.run bitince (hata olsa da) çağrılır; kaynakları serbest bırakır
+    def finish(self, sim):
+        pass
+
+
+# o1.py/o2.py'deki rl_controller'ın tick tabanlı karşılığı: tüm ışıklar
+# `period` saniyelik döngünün ilk `green` saniyesinde yeşil, kalanında kırmızı.
+# Saniye, `fps` tick'tir (o1.py/o2.py saniyede 30 kare çalışır).
+class CycleController(SignalController):
+    def __init__(self, period=10, green=5, fps=30):
+        self.period = period
+        self.green = green
+        self.fps = fps
+        self._phase = None
+        self._known = 0  # durumu en az bir kez gönderilmiş ışık sayısı
+
+    def reset(self, sim):
+        self._phase = None
+        self._known = 0
+
+    def observe(self, sim):
+        return len(sim.signals)
+
+    def decide(self, tick, count):
+        phase = (tick // self.fps) % self.period < self.green
+        if phase != self._phase:
+            # Döngü değişti: tüm ışıkların durumu değişir
+            slots = np.arange(count)
+        elif count > self._known:
+            # Sonradan eklenen ışıklar mevcut durumu alır
+            slots = np.arange(self._known, count)
+        else:
+            return NO_CHANGES
+        self._phase = phase
+        self._known = count
+        return slots, np.full(len(slots), phase, dtype=bool)
+
+
+# Kontrolörü bir işçi iş parçacığında çalıştırır: tick t simüle edilirken tick
+# t + 1'in kararları, tick t başındaki gözleme göre hesaplanır ve bir sonraki
+# tick'te beklenerek uygulanır. Gecikme her zaman bir tick'tir; sonuç iş
+# parçacığının zamanlamasından bağımsızdır.
+class ThreadedController(SignalController):
+    def __init__(self, controller):
+        self.controller = controller
+        self._executor = None
+        self._pending = None
+
+    def reset(self, sim):
+        self.controller.reset(sim)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def step(self, tick, sim):
+        observation = self.controller.observe(sim)
+        if self._pending is None or self._pending[0] != tick:
+            changes = self.controller.decide(tick, observation)
+        else:
+            changes = self._pending[1].result()
+        future = self._executor.submit(self.controller.decide, tick + 1, observation)
+        self._pending = (tick + 1, future)
+        return changes
+
+    # Çalıştırma bitince işçi iş parçacığı kapanır; sonraki reset yenisini açar
+    def finish(self, sim):
+        self.controller.finish(sim)
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        self._pending = None
+
+
+# Kontrolör kararlarını plana uygula (yalnızca değişen ışıklar)
+def apply_changes(plan, changes):
+    if not isinstance(plan, SignalPlan):
+        raise TypeError("Signal controllers need a SignalPlan")
+    slots, green = changes
+    if len(slots):
+        plan.set_state(slots, green)
+    return len(slots)
@@ -0,0 +1,109 @@
+import numpy as np
+
+# Geçmiş kipleri:
+#   "dense"  -> son `history` tick'in kenar başına sayımları (tick x kenar int32 halka)
+#   "sparse" -> son `history` tick'te sayılan kenar kimlikleri (tick başına küçük dizi)
+HISTORY_MODES = ("dense", "sparse")
+
+
+# Kenar yoğunluğu biriktiricisi: yoğun kenar kimliğiyle indekslenen int32 sayaç
+# dizisi, toplam sayım ve tick başına toplamlar tutulur. İsteğe bağlı olarak son
+# `history` tick'in anlık görüntüleri bir halka tamponda saklanır; bellek tick
+# sayısıyla değil halka boyuyla sınırlıdır.
+class DensityAccumulator:
+    def __init__(self, num_edges, history=0, history_mode="sparse"):
+        if history_mode not in HISTORY_MODES:
+            raise ValueError(f"Unrecognized history mode {history_mode!r}")
+        self.num_edges = num_edges
+        self.history = history
+        self.history_mode = history_mode
+        self.counts = np.zeros(num_edges, dtype=np.int32)
+        self._totals = np.zeros(1024, dtype=np.int64)
+        if history_mode == "dense":
+            self._ring = np.zeros((history, num_edges), dtype=np.int32)
+        else:
+            self._ring = [None] * history
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = 0
+        self.ticks = 0
+
+    def __len__(self):
+        return self.ticks
+
+    @property
+    def nbytes(self):
+        ring = self._ring.nbytes if self.history_mode == "dense" else \
+            sum(edges.nbytes for edges in self._ring if edges is not None)
+        return self.counts.nbytes + self._totals.nbytes + ring
+
+    # Bu tick'te sayılacak kenar kimliklerini ekle (aynı kenar birden çok kez olabilir)
+    def add(self, edges):
+        edges = np.asarray(edges, dtype=np.int32)
+        self.counts += np.bincount(edges, minlength=self.num_edges).astype(np.int32)
+        self.total += len(edges)
+
+        if self.ticks == len(self._totals):
+            self._totals = np.concatenate([self._totals, np.zeros_like(self._totals)])
+        self._totals[self.ticks] = len(edges)
+
+        if self.history:
+            slot = self.ticks % self.history
+            if self.history_mode == "dense":
+                self._ring[slot] = np.bincount(edges, minlength=self.num_edges)
+            else:
+                self._ring[slot] = edges.copy()
+        self.ticks += 1
+
+    # Tick başına toplam sayım (tick başına O(1) okuma)
+    @property
+    def totals(self):
+        return self._totals[:self.ticks]
+
+    # Halkada hâlâ tutulan ilk tick
+    @property
+    def first_retained(self):
+        return max(0, self.ticks - self.history)
+
+    # Belirli bir tick'in kenar başına sayımları; halkadan düşmüşse IndexError
+    def snapshot(self, tick):
+        if tick < 0:
+            tick += self.ticks
+        if not self.first_retained <= tick < self.ticks:
+            raise IndexError(f"Tick {tick} is not retained")
+        entry = self._ring[tick % self.history]
+        if self.history_mode == "dense":
+            return entry.copy()
+        return np.bincount(entry, minlength=self.num_edges).astype(np.int32)
+
+    # Saklanan tick'leri (tick, kenar sayımları) olarak sırayla döndür
+    def snapshots(self):
+        for tick in range(self.first_retained, self.ticks):
+            yield tick, self.snapshot(tick)
+
+
+# run_simulation sözlüğü biçiminde sıfır yoğunluk: (u, v, key) -> 0.
+# graph bir osmnx/networkx MultiDiGraph ya da RoadGraph olabilir.
+def reset_traffic_density(graph):
+    edges = graph.edge_tuples() if hasattr(graph, "edge_tuples") else graph.edges(keys=True)
+    return {edge: 0 for edge in edges}
+
+
+# Işıksız ve ışıklı çalıştırmaların toplam yoğunluklarını karşılaştırıp yazdır;
+# yoğunluktaki azalma yüzdesini döndürür
+def compare_densities(initial, final):
+    initial_total = sum(initial.values())  # Trafik ışıksız toplam yoğunluk
+    final_total = sum(final.get(edge, 0) for edge in initial)  # Trafik ışıklı toplam yoğunluk (her iki simülasyondaki ortak kenarlar için)
+
+    # Yüzde farkını hesapla
+    if initial_total > 0:  # Bölme hatalarını önlemek için
+        improvement_percentage = ((initial_total - final_total) / initial_total) * 100
+    else:
+        improvement_percentage = 0
+
+    print(f"Trafik ışıksız toplam yoğunluk: {initial_total}")
+    print(f"Trafik ışıklı toplam yoğunluk: {final_total}")
+    print(f"Trafik ışıkları ile yoğunluk yüzde {improvement_percentage:.2f} oranında azaldı.")
+    return improvement_percentage
@@ -0,0 +1,185 @@
+import ast
+import json
+import os
+import sys
+
+import numpy as np
+
+# Yoğunluk kaydı biçimi (bir klasör):
+#   header.json    -> sürüm, kenar sayısı, tick sayısı, veri tipi, serbest meta veri
+#   edge_u.npy     -> kenar tablosu sütunları (int64 OSM kimlikleri / anahtar)
+#   edge_v.npy
+#   edge_key.npy
+#   density.i32    -> tick x kenar int32 matris, satır düzeninde ham bayt; her tick
+#                     dosyanın sonuna bir satır olarak eklenir
+# Okuyucu tüm dosyaları np.memmap / mmap_mode="r" ile açar; dilimler kopya değildir.
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+MATRIX_FILE = "density.i32"
+EDGE_COLUMNS = ("edge_u", "edge_v", "edge_key")
+
+
+def _edge_columns(edges):
+    if isinstance(edges, tuple) and len(edges) == 3 and all(isinstance(c, np.ndarray) for c in edges):
+        return tuple(np.asarray(c, dtype=np.int64) for c in edges)
+    table = np.asarray(list(edges), dtype=np.int64).reshape(-1, 3)
+    return table[:, 0].copy(), table[:, 1].copy(), table[:, 2].copy()
+
+
+# Bir RoadGraph'ın kenar tablosu (yoğun kenar kimliği sırasıyla)
+def road_edge_columns(road):
+    return road.osm_id(road.edge_u), road.osm_id(road.indices), road.edge_key.astype(np.int64)
+
+
+# Tick başına bir kenar yoğunluğu satırını diske ekleyen yazıcı.
+# edges: (u, v, key) demetleri ya da (u, v, key) sütun dizileri.
+class DensityWriter:
+    def __init__(self, path, edges, meta=None):
+        self.path = path
+        self.columns = _edge_columns(edges)
+        self.num_edges = len(self.columns[0])
+        self.meta = meta or {}
+        self.ticks = 0
+        os.makedirs(path, exist_ok=True)
+        for name, column in zip(EDGE_COLUMNS, self.columns):
+            np.save(os.path.join(path, name + ".npy"), column)
+        self._file = open(os.path.join(path, MATRIX_FILE), "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            "version": FORMAT_VERSION,
+            "num_edges": self.num_edges,
+            "ticks": self.ticks,
+            "dtype": "<i4",
+            "meta": self.meta,
+        }
+        tmp_path = os.path.join(self.path, HEADER_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, HEADER_FILE))
+
+    # Bir ya da birden çok tick satırı (kenar sayısı uzunluğunda) ekle
+    def append(self, counts):
+        rows = np.asarray(counts, dtype="<i4").reshape(-1, self.num_edges)
+        self._file.write(rows.tobytes())
+        self.ticks += len(rows)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Kaydedilmiş bir yoğunluk geçmişini sıfır kopyayla açar
+class DensityRun:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            self.header = json.load(f)
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported density format version {self.header['version']}")
+        self.num_edges = self.header["num_edges"]
+        self.edge_u, self.edge_v, self.edge_key = (
+            np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in EDGE_COLUMNS)
+
+        # Yazıcı kapanmadan kesilen kayıtlar da okunabilsin diye tick sayısı dosya boyundan
+        matrix_path = os.path.join(path, MATRIX_FILE)
+        row_bytes = 4 * self.num_edges
+        ticks = os.path.getsize(matrix_path) // row_bytes if row_bytes else 0
+        if ticks:
+            self.matrix = np.memmap(matrix_path, dtype=self.header["dtype"], mode="r",
+                                    shape=(ticks, self.num_edges))
+        else:
+            self.matrix = np.zeros((0, self.num_edges), dtype=self.header["dtype"])
+
+    @property
+    def meta(self):
+        return self.header["meta"]
+
+    @property
+    def ticks(self):
+        return len(self.matrix)
+
+    def __len__(self):
+        return self.ticks
+
+    def edge_tuples(self):
+        return list(zip(self.edge_u.tolist(), self.edge_v.tolist(), self.edge_key.tolist()))
+
+    # Tick aralığı boyunca kenar başına toplam yoğunluk
+    def totals(self, start=0, stop=None):
+        return self.matrix[start:stop].sum(axis=0, dtype=np.int64)
+
+    # Tick başına toplam yoğunluk
+    def tick_totals(self, start=0, stop=None):
+        return self.matrix[start:stop].sum(axis=1, dtype=np.int64)
+
+    # run_simulation'ın döndürdüğü biçimde {(u, v, key): sayım} sözlüğü
+    def to_dict(self, start=0, stop=None):
+        return dict(zip(self.edge_tuples(), self.totals(start, stop).tolist()))
+
+
+# Simülasyona gözlemci olarak bağlanıp her tick'in yoğunluk satırını kaydeder
+class DensityRecorder:
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = meta
+        self.writer = None
+        self._previous = None
+
+    def on_start(self, sim):
+        self.writer = DensityWriter(self.path, road_edge_columns(sim.road), self.meta)
+        self._previous = sim.density.copy()
+
+    def on_tick(self, sim):
+        counts = sim.density
+        self.writer.append(counts - self._previous)
+        self._previous[:] = counts
+        return True
+
+    def on_finish(self, sim):
+        self.writer.close()
+
+
+# Tek seferde yazma kolaylığı: matrix (tick x kenar) ya da tek bir kenar sayım satırı
+def write_run(path, edges, matrix, meta=None):
+    with DensityWriter(path, edges, meta) as writer:
+        writer.append(matrix)
+    return DensityRun(path)
+
+
+# Eski biçim: {"(u, v, key)": sayım} anahtarlı JSON (traffic_density.json)
+def load_legacy_json(path):
+    with open(path) as f:
+        raw = json.load(f)
+    return {tuple(ast.literal_eval(key)): count for key, count in raw.items()}
+
+
+def save_legacy_json(density, path):
+    with open(path, "w") as f:
+        json.dump({str(tuple(edge)): count for edge, count in density.items()}, f)
+
+
+# Eski JSON'u tek tick'lik ikili kayda çevir (zaman boyutu olmadığı için)
+def convert_legacy_json(json_path, out_path):
+    density = load_legacy_json(json_path)
+    counts = np.fromiter(density.values(), dtype=np.int64, count=len(density))
+    return write_run(out_path, list(density.keys()), counts,
+                     meta={"source": os.path.basename(json_path), "legacy": True})
+
+
+# Kullanım: python -m trafficsim.density_store traffic_density.json traffic_density.density
+def main():
+    run = convert_legacy_json(sys.argv[1], sys.argv[2])
+    print(f"{run.num_edges} kenar, {run.ticks} tick -> {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import numpy as np
+
+from .density import DensityAccumulator
+from .controllers import apply_changes
+from .signals import SignalPlan, index_signals
+
+
+# Ekransız, sabit adımlı simülasyon motoru.
+# Her tick'te ışıklar güncellenir, tüm ajanlar AgentPopulation.step ile ilerletilir
+# ve kenar yoğunlukları DensityAccumulator'a sayılır. Çizim, zamanlama ve pencere olayları motorun
+# parçası değildir; bunlar isteğe bağlı gözlemciler (ör. pygame_view.PygameView)
+# olarak bağlanır. Gözlemcilerin isteğe bağlı metotları:
+#   on_start(sim), on_tick(sim) -> False dönerse simülasyon durur, on_finish(sim)
+class Simulation:
+    def __init__(self, road, agents, signals=None, with_traffic_lights=True, observers=(),
+                 history=0, history_mode="sparse", controller=None, profiler=None):
+        self.road = road
+        self.agents = agents
+        # Düğüm (tl1.py) ya da (u, v) şerit (o2.py) anahtarlı SignalPlan ya da TrafficLight sözlüğü
+        self.signals = signals if signals is not None else {}
+        self.with_traffic_lights = with_traffic_lights
+        self.observers = list(observers)
+        # İsteğe bağlı tick tabanlı kontrolör (controllers.SignalController); SignalPlan ister
+        self.controller = controller
+        # İsteğe bağlı faz profilleyicisi (profiling.Profiler); ajan adımının fazlarını da ölçer
+        self.profiler = profiler
+        if profiler is not None:
+            agents.profiler = profiler
+        self.tick = 0
+        # Son `history` tick'in anlık yoğunlukları isteğe bağlı olarak saklanır (tl2.py)
+        self.accumulator = DensityAccumulator(road.num_edges, history, history_mode)
+        self._signal_index = None
+
+    def attach(self, observer):
+        self.observers.append(observer)
+        return observer
+
+    # Kenar başına toplam yoğunluk (int32, yoğun kenar kimliğiyle indeksli)
+    @property
+    def density(self):
+        return self.accumulator.counts
+
+    def reset_density(self):
+        self.accumulator.reset()
+        self.tick = 0
+
+    def _index_signals(self):
+        # Işık anahtarlarını bir kez düğüm/kenar indekslerine eşle
+        self._signal_index = (len(self.signals),) + index_signals(self.road, self.signals.keys())
+
+    def _signal_layout(self):
+        if self._signal_index is None or self._signal_index[0] != len(self.signals):
+            self._index_signals()
+        return self._signal_index[1:]
+
+    # Tüm ışıkların yeşil durumu, signals sırasıyla (SignalPlan'da doğrudan dizi)
+    def green_states(self):
+        if isinstance(self.signals, SignalPlan):
+            return self.signals.green
+        return np.array([signal.is_green() for signal in self.signals.values()], dtype=bool)
+
+    # Kırmızı ışık maskeleri: düğüm bazlı ve şerit (kenar) bazlı
+    def red_masks(self):
+        node_idx, node_slots, edge_ids, edge_slots = self._signal_layout()
+        green = self.green_states()
+        node_red = edge_red = None
+        if len(node_slots):
+            node_red = np.zeros(self.road.num_nodes, dtype=bool)
+            node_red[node_idx] = ~green[node_slots]
+        if len(edge_slots):
+            edge_red = np.zeros(self.road.num_edges, dtype=bool)
+            edge_red[edge_ids] = ~green[edge_slots]
+        return node_red, edge_red
+
+    # Her ışıkta bekleyen (son adımda ilerleyemeyen) ajan sayısı, signals sırasıyla
+    def queue_lengths(self):
+        node_idx, node_slots, edge_ids, edge_slots = self._signal_layout()
+        agents = self.agents
+        waiting = np.flatnonzero(~agents.reached & ~agents.moved & (agents.next_node >= 0))
+        queues = np.zeros(len(self.signals), dtype=np.int32)
+        if len(node_slots):
+            queues[node_slots] = np.bincount(agents.next_node[waiting],
+                                             minlength=self.road.num_nodes)[node_idx]
+        if len(edge_slots):
+            edges = self.road.edge_ids(agents.position[waiting], agents.next_node[waiting])
+            queues[edge_slots] = np.bincount(edges, minlength=self.road.num_edges)[edge_ids]
+        return queues
+
+    def step(self):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_tick(self.tick)
+        if self.with_traffic_lights:
+            if isinstance(self.signals, SignalPlan):
+                self.signals.update()
+            else:
+                for signal in self.signals.values():
+                    signal.update()
+            if self.controller is not None:
+                apply_changes(self.signals, self.controller.step(self.tick, self))
+        if profiler is not None:
+            profiler.lap("signals")
+        node_red, edge_red = self.red_masks()
+        if profiler is not None:
+            profiler.lap("masks")
+        edges = self.agents.step(node_red=node_red, edge_red=edge_red)
+        self.accumulator.add(edges)
+        if profiler is not None:
+            profiler.lap("density")
+        self.tick += 1
+
+    def _notify(self, name):
+        for observer in self.observers:
+            method = getattr(observer, name, None)
+            if method is not None:
+                method(self)
+
+    # ticks verilmezse bir gözlemci durdurana kadar (ör. pencere kapanana kadar) çalışır
+    def run(self, ticks=None):
+        if ticks is None and not self.observers:
+            raise ValueError("A headless run needs a tick count")
+        if self.controller is not None:
+            self.controller.reset(self)
+        self._notify("on_start")
+        profiler = self.profiler
+        phases = [f"observer:{type(observer).__name__}" for observer in self.observers]
+        try:
+            end = None if ticks is None else self.tick + ticks
+            while end is None or self.tick < end:
+                self.step()
+                keep_running = True
+                for observer, phase in zip(self.observers, phases):
+                    on_tick = getattr(observer, "on_tick", None)
+                    if on_tick is not None and on_tick(self) is False:
+                        keep_running = False
+                    if profiler is not None:
+                        profiler.lap(phase)
+                if not keep_running:
+                    break
+        finally:
+            if profiler is not None:
+                profiler.finish()
+            if self.controller is not None:
+                self.controller.finish(self)
+            self._notify("on_finish")
+        return self.density_dict()
+
+    # run_simulation'ın döndürdüğü sözlük: (u, v, key) ya da o2.py'deki gibi (u, v) anahtarlı;
+    # "undirected" iki yönü o1.py'nin ilk sürümündeki gibi sıralı (u, v) anahtarında toplar
+    def density_dict(self, keys="uvk"):
+        edge_tuples = self.road.edge_tuples()
+        counts = self.density.tolist()
+        if keys == "uvk":
+            return dict(zip(edge_tuples, counts))
+        if keys == "uv":
+            density = {}
+            for (u, v, _), count in zip(edge_tuples, counts):
+                density[(u, v)] = density.get((u, v), 0) + count
+            return density
+        if keys == "undirected":
+            density = {}
+            for (u, v, _), count in zip(edge_tuples, counts):
+                edge = (u, v) if u <= v else (v, u)
+                density[edge] = density.get(edge, 0) + count
+            return density
+        raise ValueError(f"Unrecognized keys {keys!r}")
+
+    def reached_stats(self):
+        total = len(self.agents)
+        reached = int(self.agents.reached.sum())
+        return {
+            "total": total,
+            "reached": reached,
+            "not_reached": total - reached,
+            "reached_percentage": reached / total * 100 if total else 0.0,
+            "not_reached_percentage": (total - reached) / total * 100 if total else 0.0,
+        }
@@ -0,0 +1,203 @@
+import heapq
+import math
+
+import numpy as np
+
+from .engine import Simulation
+from .signals import SignalPlan, index_signals
+
+# Kenar geçiş süreleri:
+#   "hop"    -> tl1.py/hayat.py: her kenar 1 tick (ilk kenar 0), Simulation(mode="hop") ile birebir aynı
+#   "length" -> kenarın `length` (metre) değeri / ajan hızı (metre/tick)
+TRAVEL_MODES = ("hop", "length")
+
+_GATE, _GREEN = 0, 1
+
+
+# Olay tabanlı (discrete-event) simülasyon motoru.
+# Ajanlar tick tick ilerletilmez: her ajanın bulunduğu kenarın sonuna (dur çizgisine)
+# varış zamanı hesaplanıp bir yığına (heap) konur ve zaman olaydan olaya atlar. Dur
+# çizgisinde kenarın şerit ışığı ve varılan düğümün ışığı yeşilse ajan hemen sonraki
+# kenara geçer; kırmızıysa ışığın kuyruğuna girer ve ışığın yeşile döndüğü an bir olay
+# olarak planlanır. Işık durumları SignalPlan'ın kapalı formundan hesaplanır; zaman
+# birimi tick'tir ve Simulation'daki gibi t anında plan tick'i t + 1'dir.
+# Kenar yoğunluğu, ajanların kenarda geçirdiği sürenin integralidir (ajan x tick):
+# "hop" kipinde Simulation'ın tick tick saydığı yoğunlukla aynıdır. count_waiting=False
+# ise ışıkta beklenen süre sayılmaz (o2.py'deki gibi yalnızca hareket eden araçlar).
+# Ajanlar arası etkileşim (çarpışma, kapasite) yoktur ve kontrolör desteklenmez;
+# rotalar AgentPopulation'dan alınır ve çalıştırma sonunda popülasyona geri yazılır.
+class EventSimulation:
+    def __init__(self, road, agents, signals=None, with_traffic_lights=True, travel="hop",
+                 speed=None, count_waiting=True):
+        if travel not in TRAVEL_MODES:
+            raise ValueError(f"Unrecognized travel mode {travel!r}")
+        self.road = road
+        self.agents = agents
+        if signals is None:
+            signals = SignalPlan()
+        elif not isinstance(signals, SignalPlan):
+            signals = SignalPlan.from_lights(signals)
+        self.signals = signals
+        self.with_traffic_lights = with_traffic_lights
+        self.travel = travel
+        # "length" kipinde ajan başına hız (metre/tick); verilmezse agents.speed
+        self.speed = speed
+        self.count_waiting = count_waiting
+        self.time = 0.0
+        self.events = 0  # işlenen olay sayısı
+        self._settled = [0.0] * road.num_edges  # tamamlanan kenar geçişlerinin süreleri
+        self._heap = None
+
+    # Rotaları ata ve her ajanın ilk dur çizgisi olayını planla
+    def _start(self):
+        agents, road, plan = self.agents, self.road, self.signals
+        agents.assign_routes()
+        self._plan_tick = plan.tick
+        self._cycle = (plan.red_duration + plan.green_duration).tolist()
+        self._red = plan.red_duration.tolist()
+        self._green_duration = plan.green_duration.tolist()
+        self._offset = plan.offset.tolist()
+        self._green = plan.green.tolist()
+        node_idx, node_slots, edge_ids, edge_slots = index_signals(road, plan.keys())
+        node_slot = np.full(road.num_nodes, -1, dtype=np.int64)
+        node_slot[node_idx] = node_slots
+        edge_slot = np.full(road.num_edges, -1, dtype=np.int64)
+        edge_slot[edge_ids] = edge_slots
+
+        # Aktif ajanların kalan rotaları tek düz dizide: ajan başına [başlangıç, bitiş) kenar aralığı
+        active = np.flatnonzero((agents.next_node >= 0) & ~agents.reached)
+        paths = [agents.paths.remaining(i) for i in active.tolist()]
+        hops = np.array([len(path) - 1 for path in paths], dtype=np.int64)
+        nodes = np.concatenate(paths) if paths else np.zeros(0, dtype=np.int32)
+        tail = np.ones(len(nodes), dtype=bool)
+        tail[np.cumsum(hops + 1) - 1] = False  # her rotanın son düğümü kenar başlatmaz
+        us, vs = nodes[tail], nodes[np.roll(tail, 1)]
+        edges = road.edge_ids(us, vs)
+        ends = np.cumsum(hops)
+        starts = ends - hops
+        if self.travel == "hop":
+            travel = np.ones(len(edges))
+            travel[starts] = 0.0  # ajan ilk kenarın dur çizgisinde başlar
+        else:
+            speed = agents.speed if self.speed is None else np.broadcast_to(self.speed, (len(agents),))
+            travel = road.length[edges] / np.repeat(speed[active], hops)
+
+        self._agent_ids = active.tolist()
+        self._edges = edges.tolist()
+        self._travel = travel.tolist()
+        # Kenar sonundaki ışık yuvaları (düğüm ışığı, şerit ışığı); ışıksız kenarlar için boş
+        self._gates = [tuple(slot for slot in pair if slot >= 0)
+                       for pair in zip(node_slot[vs].tolist(), edge_slot[edges].tolist())]
+        self._cursor = starts.tolist()
+        self._end = ends.tolist()
+        self._starts = starts
+        self._cursor0 = agents.paths.cursor[active].astype(np.int64)
+        self._entry = [self.time] * len(active)
+        self._wait_start = [None] * len(active)
+        self._queues = {}  # ışık yuvası -> bekleyen ajanlar
+        self._heap = []
+        self._seq = 0
+        for a in range(len(active)):
+            self._push(self.time + self._travel[starts[a]], _GATE, a)
+
+    def _push(self, time, kind, index):
+        heapq.heappush(self._heap, (time, self._seq, kind, index))
+        self._seq += 1
+
+    # Işığın t anındaki ya da sonraki ilk yeşil anı (hiç yeşil olmayacaksa inf)
+    def _next_green(self, slot, t):
+        if not self.with_traffic_lights or not self._cycle[slot]:
+            return t if self._green[slot] else math.inf
+        start = math.floor(t)
+        phase = (self._plan_tick + start + 1 + self._offset[slot]) % self._cycle[slot]
+        if phase >= self._red[slot]:
+            return t
+        if not self._green_duration[slot]:
+            return math.inf
+        return float(start + self._red[slot] - phase)
+
+    # a ajanı t anında dur çizgisinde: geçebiliyorsa sonraki kenara geçer, yoksa kuyruğa girer
+    def _gate(self, a, t):
+        j = self._cursor[a]
+        for slot in self._gates[j]:
+            green_at = self._next_green(slot, t)
+            if green_at > t:
+                if self._wait_start[a] is None:
+                    self._wait_start[a] = t
+                queue = self._queues.get(slot)
+                if queue is None:
+                    # Kuyruğu boş ışığın yeşile dönüşü planlanır (hiç dönmeyecekse ajan bekler)
+                    queue = self._queues[slot] = []
+                    if green_at < math.inf:
+                        self._push(green_at, _GREEN, slot)
+                queue.append(a)
+                return
+        occupied = t - self._entry[a]
+        waited = self._wait_start[a]
+        if waited is not None:
+            self._wait_start[a] = None
+            if not self.count_waiting:
+                occupied -= t - waited
+        self._settled[self._edges[j]] += occupied
+        j += 1
+        self._cursor[a] = j
+        self._entry[a] = t
+        if j < self._end[a]:
+            heapq.heappush(self._heap, (t + self._travel[j], self._seq, _GATE, a))
+            self._seq += 1
+
+    # `until` anına kadar (hariç) olayları işle; run_simulation'ın sözlüğünü döndürür
+    def run(self, until):
+        if self._heap is None:
+            self._start()
+        heap = self._heap
+        while heap and heap[0][0] < until:
+            t, _, kind, index = heapq.heappop(heap)
+            self.events += 1
+            if kind == _GATE:
+                self._gate(index, t)
+            else:
+                for a in self._queues.pop(index):
+                    self._gate(a, t)
+        if self.with_traffic_lights:
+            self.signals.update(math.floor(until) - math.floor(self.time))
+        self.time = float(until)
+        self._sync()
+        return self.density_dict()
+
+    # Kenar başına yoğunluk integrali (float64, yoğun kenar kimliğiyle indeksli);
+    # kenarında olan ajanların şu ana kadarki süresi dahildir
+    @property
+    def density(self):
+        density = np.array(self._settled, dtype=np.float64)
+        if self._heap is None:
+            return density
+        for a, j in enumerate(self._cursor):
+            if j == self._end[a]:
+                continue
+            occupied = self.time - self._entry[a]
+            if not self.count_waiting and self._wait_start[a] is not None:
+                occupied -= self.time - self._wait_start[a]
+            density[self._edges[j]] += occupied
+        return density
+
+    # Ajanların konum, sonraki düğüm ve yol imleçlerini AgentPopulation'a yaz
+    # (hedefe varanlar hedef düğümde, diğerleri bulundukları kenarın başında)
+    def _sync(self):
+        agents, road = self.agents, self.road
+        ids = np.array(self._agent_ids, dtype=np.int64)
+        if not len(ids):
+            return
+        cursor = np.array(self._cursor, dtype=np.int64)
+        done = cursor == np.array(self._end, dtype=np.int64)
+        agents.paths.cursor[ids] = self._cursor0 + (cursor - self._starts)
+        edges = np.array(self._edges, dtype=np.int64)
+        last = edges[np.maximum(cursor - 1, 0)]
+        current = edges[np.minimum(cursor, len(edges) - 1)]
+        agents.position[ids] = np.where(done, road.indices[last], road.edge_u[current])
+        agents.next_node[ids] = np.where(done, -1, road.indices[current])
+        agents.reached[ids] = done
+        agents.pos[ids] = agents.node_positions[agents.position[ids]]
+
+    density_dict = Simulation.density_dict
+    reached_stats = Simulation.reached_stats
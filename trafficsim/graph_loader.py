@@ -0,0 +1,422 @@
+import glob
+import hashlib
+import json
+import os
+import re
+from itertools import groupby, pairwise
+
+import numpy as np
+
+# Overpass yanıtlarının (osmnx HTTP önbelleği) bulunduğu klasör, depo kökünde
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
+SNAPSHOT_FOLDER = os.path.join(CACHE_FOLDER, "snapshots")
+
+# Anlık görüntü biçimi değişirse eski dosyalar geçersiz sayılsın diye anahtara eklenir
+SNAPSHOT_VERSION = 3
+
+# osmnx'in ağ tipi filtreleri (Overpass QL), yerel olarak uygulanmak üzere
+_DEFAULT_ACCESS = '["access"!~"private"]'
+NETWORK_FILTERS = {
+    "drive": (
+        f'["highway"]["area"!~"yes"]{_DEFAULT_ACCESS}'
+        '["highway"!~"abandoned|bridleway|bus_guideway|construction|corridor|'
+        "cycleway|elevator|escalator|footway|no|path|pedestrian|planned|platform|"
+        'proposed|raceway|razed|rest_area|service|services|steps|track"]'
+        '["motor_vehicle"!~"no"]["motorcar"!~"no"]'
+        '["service"!~"alley|driveway|emergency_access|parking|parking_aisle|private"]'
+    ),
+    "drive_service": (
+        f'["highway"]["area"!~"yes"]{_DEFAULT_ACCESS}'
+        '["highway"!~"abandoned|bridleway|bus_guideway|construction|corridor|'
+        "cycleway|elevator|escalator|footway|no|path|pedestrian|planned|platform|"
+        'proposed|raceway|razed|rest_area|services|steps|track"]'
+        '["motor_vehicle"!~"no"]["motorcar"!~"no"]'
+        '["service"!~"emergency_access|parking|parking_aisle|private"]'
+    ),
+    "walk": (
+        f'["highway"]["area"!~"yes"]{_DEFAULT_ACCESS}'
+        '["highway"!~"abandoned|bus_guideway|construction|cycleway|motor|no|planned|'
+        'platform|proposed|raceway|razed|rest_area|services"]'
+        '["foot"!~"no"]["service"!~"private"]'
+        '["sidewalk"!~"separate"]["sidewalk:both"!~"separate"]'
+        '["sidewalk:left"!~"separate"]["sidewalk:right"!~"separate"]'
+    ),
+    "bike": (
+        f'["highway"]["area"!~"yes"]{_DEFAULT_ACCESS}'
+        '["highway"!~"abandoned|bus_guideway|construction|corridor|elevator|'
+        "escalator|footway|motor|no|planned|platform|proposed|raceway|razed|"
+        'rest_area|services|steps"]'
+        '["bicycle"!~"no"]["service"!~"private"]'
+    ),
+    "all_public": (
+        f'["highway"]["area"!~"yes"]{_DEFAULT_ACCESS}'
+        '["highway"!~"abandoned|construction|no|planned|platform|proposed|raceway|'
+        'razed|rest_area|services"]'
+        '["service"!~"private"]'
+    ),
+    "all": (
+        '["highway"]["area"!~"yes"]["highway"!~"abandoned|construction|no|planned|'
+        'platform|proposed|raceway|razed|rest_area|services"]'
+    ),
+}
+
+# Hangi ağ tipinin yanıtı hangi ağ tiplerini de kapsar (dar -> geniş)
+NETWORK_SUPERSETS = {
+    "drive": {"drive"},
+    "drive_service": {"drive", "drive_service"},
+    "walk": {"walk"},
+    "bike": {"bike"},
+    "all_public": {"drive", "drive_service", "walk", "bike", "all_public"},
+    "all": {"drive", "drive_service", "walk", "bike", "all_public", "all"},
+}
+
+BIDIRECTIONAL_NETWORK_TYPES = {"walk"}
+ONEWAY_VALUES = {"yes", "true", "1", "-1", "reverse", "T", "F"}
+REVERSED_VALUES = {"-1", "reverse", "T"}
+
+USEFUL_TAGS_NODE = ["highway", "junction", "railway", "ref"]
+USEFUL_TAGS_WAY = ["bridge", "tunnel", "oneway", "lanes", "ref", "name", "highway",
+                   "maxspeed", "service", "access", "area", "landuse", "width",
+                   "est_width", "junction"]
+
+# Anlık görüntüde saklanan kenar nitelikleri ve tipleri: grafa konan tüm yol etiketleri
+# (USEFUL_TAGS_WAY) saklanır, böylece önbellekten yüklenen graf ilk kurulanla aynıdır
+EDGE_ATTRS = {"osmid": int, "reversed": bool}
+EDGE_ATTRS.update({tag: bool if tag == "oneway" else str for tag in USEFUL_TAGS_WAY})
+NODE_ATTRS = list(USEFUL_TAGS_NODE)
+LIST_SEPARATOR = ";"
+
+_FILTER_CLAUSE = re.compile(r'\["([^"]+)"(?:(!?~)"([^"]*)")?\]')
+
+
+def _parse_filter(way_filter):
+    # ["k"] -> etiket zorunlu, ["k"!~"re"] -> etiket yoksa ya da eşleşmiyorsa geçer
+    clauses = []
+    for key, op, pattern in _FILTER_CLAUSE.findall(way_filter):
+        clauses.append((key, op, re.compile(pattern) if op else None))
+    return clauses
+
+
+def way_matches(tags, clauses):
+    for key, op, pattern in clauses:
+        value = tags.get(key)
+        if not op:
+            if value is None:
+                return False
+        elif op == "!~":
+            if value is not None and pattern.search(value):
+                return False
+        elif value is None or not pattern.search(value):
+            return False
+    return True
+
+
+def _bbox_from_point(center_point, dist):
+    # osmnx.utils_geo.bbox_from_point ile aynı küresel yaklaşım: (west, south, east, north)
+    lat, lon = center_point
+    earth_radius = 6_371_009
+    delta_lat = (dist / earth_radius) * (180 / np.pi)
+    delta_lon = (dist / earth_radius) * (180 / np.pi) / np.cos(lat * np.pi / 180)
+    return (lon - delta_lon, lat - delta_lat, lon + delta_lon, lat + delta_lat)
+
+
+def _response_extent(elements):
+    lats = [e["lat"] for e in elements if e["type"] == "node"]
+    lons = [e["lon"] for e in elements if e["type"] == "node"]
+    if not lats:
+        return None
+    return (min(lons), min(lats), max(lons), max(lats))
+
+
+def _response_network_type(elements):
+    # Yanıttaki tüm yolların geçtiği en dar filtre, sorgunun ağ tipini verir
+    ways = [e.get("tags", {}) for e in elements if e["type"] == "way"]
+    for network_type in ["drive", "drive_service", "walk", "bike", "all_public", "all"]:
+        clauses = _parse_filter(NETWORK_FILTERS[network_type])
+        if all(way_matches(tags, clauses) for tags in ways):
+            return network_type
+    return "all"
+
+
+def find_cached_response(center_point, radius, network_type, cache_folder=CACHE_FOLDER):
+    # Tamponlu sınır kutusunu kapsayan ve ağ tipine uyan en küçük Overpass yanıtını seç
+    west, south, east, north = _bbox_from_point(center_point, radius + 500)
+    best = None
+    for path in glob.glob(os.path.join(cache_folder, "*.json")):
+        with open(path, encoding="utf-8") as f:
+            response = json.load(f)
+        elements = response.get("elements") if isinstance(response, dict) else None
+        if not elements:
+            continue
+        extent = _response_extent(elements)
+        if extent is None:
+            continue
+        if not (extent[0] <= west and extent[1] <= south and extent[2] >= east and extent[3] >= north):
+            continue
+        if network_type not in NETWORK_SUPERSETS[_response_network_type(elements)]:
+            continue
+        area = (extent[2] - extent[0]) * (extent[3] - extent[1])
+        if best is None or area < best[0]:
+            best = (area, path, response)
+    return None if best is None else best[2]
+
+
+def graph_from_overpass_json(response, network_type="all"):
+    # osmnx'in _create_graph adımının ağ filtresini yerelde uygulayan karşılığı
+    import networkx as nx
+
+    clauses = _parse_filter(NETWORK_FILTERS[network_type])
+    bidirectional = network_type in BIDIRECTIONAL_NETWORK_TYPES
+
+    nodes = {}
+    paths = []
+    for element in response["elements"]:
+        if element["type"] == "node":
+            node = {"y": element["lat"], "x": element["lon"]}
+            for tag in USEFUL_TAGS_NODE:
+                if tag in element.get("tags", {}):
+                    node[tag] = element["tags"][tag]
+            nodes[element["id"]] = node
+        elif element["type"] == "way" and way_matches(element.get("tags", {}), clauses):
+            path = {"osmid": element["id"]}
+            path["nodes"] = [group[0] for group in groupby(element["nodes"])]
+            for tag in USEFUL_TAGS_WAY:
+                if tag in element.get("tags", {}):
+                    path[tag] = element["tags"][tag]
+            paths.append(path)
+
+    graph = nx.MultiDiGraph(created_with="graph_loader", crs="epsg:4326")
+    used_nodes = {n for path in paths for n in path["nodes"] if n in nodes}
+    graph.add_nodes_from((n, nodes[n]) for n in used_nodes)
+
+    for path in paths:
+        path_nodes = [n for n in path.pop("nodes") if n in nodes]
+        one_way = not bidirectional and (
+            path.get("oneway") in ONEWAY_VALUES or path.get("junction") == "roundabout"
+        )
+        if one_way and path.get("oneway") in REVERSED_VALUES:
+            path_nodes.reverse()
+        path["oneway"] = one_way
+        edges = list(pairwise(path_nodes))
+        path["reversed"] = False
+        graph.add_edges_from(edges, **path)
+        if not one_way:
+            path["reversed"] = True
+            graph.add_edges_from([(v, u) for u, v in edges], **path)
+
+    _add_edge_lengths(graph)
+    return graph
+
+
+def _add_edge_lengths(graph):
+    # Kenar uçları arasındaki büyük çember mesafesi (metre)
+    import networkx as nx
+
+    edges = list(graph.edges(keys=True))
+    if not edges:
+        return
+    ys = np.array([(graph.nodes[u]["y"], graph.nodes[v]["y"]) for u, v, _ in edges])
+    xs = np.array([(graph.nodes[u]["x"], graph.nodes[v]["x"]) for u, v, _ in edges])
+    lat1, lat2 = np.radians(ys[:, 0]), np.radians(ys[:, 1])
+    dlat = lat2 - lat1
+    dlon = np.radians(xs[:, 1] - xs[:, 0])
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    lengths = 2 * 6_371_009 * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    nx.set_edge_attributes(graph, dict(zip(edges, lengths.tolist())), "length")
+
+
+def _largest_component(graph, mode):
+    if mode is None:
+        return graph
+    import osmnx as ox
+
+    return ox.truncate.largest_component(graph, strongly=(mode == "strong"))
+
+
+def build_graph(response, center_point, radius, network_type="all", largest_component="weak"):
+    # osmnx.graph_from_point (dist_type='bbox') ile aynı kırpma/sadeleştirme sırası
+    import networkx as nx
+    import osmnx as ox
+
+    graph_buff = graph_from_overpass_json(response, network_type)
+    graph_buff = ox.truncate.truncate_graph_bbox(graph_buff, _bbox_from_point(center_point, radius + 500))
+    if largest_component is not None:
+        graph_buff = ox.truncate.largest_component(graph_buff, strongly=False)
+    graph_buff = ox.simplify_graph(graph_buff)
+
+    graph = ox.truncate.truncate_graph_bbox(graph_buff, _bbox_from_point(center_point, radius))
+    graph = _largest_component(graph, largest_component)
+
+    street_counts = ox.stats.count_streets_per_node(graph_buff, nodes=graph.nodes)
+    nx.set_node_attributes(graph, values=street_counts, name="street_count")
+    return graph
+
+
+def snapshot_key(center_point, radius, network_type, largest_component):
+    key = json.dumps([SNAPSHOT_VERSION, [float(c) for c in center_point], float(radius),
+                      network_type, largest_component])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+# Anlık görüntü dosyasının yolu; önişlenmiş yönlendirme verileri de bunun yanında durur
+def snapshot_path(center_point, radius, network_type="all", largest_component="weak",
+                  snapshot_folder=SNAPSHOT_FOLDER):
+    key = snapshot_key(center_point, radius, network_type, largest_component)
+    return os.path.join(snapshot_folder, f"{key}.npz")
+
+
+def _encode(value):
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def _decode(text, kind):
+    if text == "":
+        return None
+    parts = text.split(LIST_SEPARATOR)
+    if kind is bool:
+        values = [p == "True" for p in parts]
+    elif kind is int:
+        values = [int(p) for p in parts]
+    else:
+        values = parts
+    return values if len(values) > 1 else values[0]
+
+
+def _pack_strings(arrays, name, values):
+    # Metin sütunları sözlük kodlaması ile saklanır: benzersiz değerler + int32 kodlar
+    categories, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+    arrays[f"{name}_categories"] = categories
+    arrays[f"{name}_codes"] = codes.astype(np.int32)
+
+
+def _unpack_strings(arrays, name):
+    categories = arrays[f"{name}_categories"].tolist()
+    return [categories[code] for code in arrays[f"{name}_codes"].tolist()]
+
+
+def save_snapshot(graph, path):
+    node_ids = np.fromiter(graph.nodes, dtype=np.int64, count=len(graph))
+    node_data = [graph.nodes[n] for n in node_ids.tolist()]
+    arrays = {
+        "graph_attrs": np.array(json.dumps({k: str(v) for k, v in graph.graph.items()})),
+        "node_id": node_ids,
+        "node_x": np.array([d["x"] for d in node_data], dtype=np.float64),
+        "node_y": np.array([d["y"] for d in node_data], dtype=np.float64),
+        "node_street_count": np.array([d.get("street_count", 0) for d in node_data], dtype=np.int16),
+    }
+    for attr in NODE_ATTRS:
+        _pack_strings(arrays, f"node_{attr}", [_encode(d.get(attr)) for d in node_data])
+
+    edges = list(graph.edges(keys=True, data=True))
+    arrays["edge_u"] = np.array([e[0] for e in edges], dtype=np.int64)
+    arrays["edge_v"] = np.array([e[1] for e in edges], dtype=np.int64)
+    arrays["edge_key"] = np.array([e[2] for e in edges], dtype=np.int32)
+    arrays["edge_length"] = np.array([e[3]["length"] for e in edges], dtype=np.float64)
+    for attr in EDGE_ATTRS:
+        _pack_strings(arrays, f"edge_{attr}", [_encode(e[3].get(attr)) for e in edges])
+
+    # Sadeleştirilmiş kenar geometrileri: düz koordinat dizisi + kenar başına ofset
+    offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+    coords = []
+    for i, (_, _, _, data) in enumerate(edges):
+        geometry = data.get("geometry")
+        if geometry is not None:
+            coords.extend(geometry.coords)
+        offsets[i + 1] = len(coords)
+    arrays["edge_geometry_offsets"] = offsets
+    arrays["edge_geometry_coords"] = np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, geometry=False):
+    import networkx as nx
+
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    graph = nx.MultiDiGraph(**json.loads(arrays["graph_attrs"].item()))
+    node_ids = arrays["node_id"].tolist()
+    node_x = arrays["node_x"].tolist()
+    node_y = arrays["node_y"].tolist()
+    street_count = arrays["node_street_count"].tolist()
+    node_tags = {attr: _unpack_strings(arrays, f"node_{attr}") for attr in NODE_ATTRS}
+    for i, node in enumerate(node_ids):
+        attrs = {"y": node_y[i], "x": node_x[i], "street_count": street_count[i]}
+        for attr, values in node_tags.items():
+            if values[i]:
+                attrs[attr] = values[i]
+        graph.add_node(node, **attrs)
+
+    edge_u = arrays["edge_u"].tolist()
+    edge_v = arrays["edge_v"].tolist()
+    edge_key = arrays["edge_key"].tolist()
+    edge_length = arrays["edge_length"].tolist()
+    edge_tags = {attr: _unpack_strings(arrays, f"edge_{attr}") for attr in EDGE_ATTRS}
+    lines = [None] * len(edge_u)
+    if geometry:
+        lines = _geometries(arrays["edge_geometry_offsets"], arrays["edge_geometry_coords"])
+
+    edges = []
+    for i in range(len(edge_u)):
+        attrs = {"length": edge_length[i]}
+        for attr, values in edge_tags.items():
+            value = _decode(values[i], EDGE_ATTRS[attr])
+            if value is not None:
+                attrs[attr] = value
+        if lines[i] is not None:
+            attrs["geometry"] = lines[i]
+        edges.append((edge_u[i], edge_v[i], edge_key[i], attrs))
+    graph.add_edges_from(edges)
+    return graph
+
+
+def _geometries(offsets, coords):
+    from shapely import LineString
+
+    lines = []
+    for i in range(len(offsets) - 1):
+        start, end = offsets[i], offsets[i + 1]
+        lines.append(LineString(coords[start:end]) if end > start else None)
+    return lines
+
+
+# Grafı önce ikili anlık görüntüden, yoksa cache/ altındaki Overpass yanıtından,
+# o da yoksa osmnx ile ağdan yükler ve sonucu anlık görüntü olarak saklar
+def load_graph(center_point, radius, network_type="all", largest_component="weak",
+               cache_folder=CACHE_FOLDER, snapshot_folder=SNAPSHOT_FOLDER,
+               geometry=False, refresh=False):
+    if largest_component not in ("weak", "strong", None):
+        raise ValueError(f"Unrecognized largest_component {largest_component!r}")
+    if network_type not in NETWORK_FILTERS:
+        raise ValueError(f"Unrecognized network_type {network_type!r}")
+
+    path = snapshot_path(center_point, radius, network_type, largest_component, snapshot_folder)
+    if os.path.exists(path) and not refresh:
+        return load_snapshot(path, geometry=geometry)
+
+    response = find_cached_response(center_point, radius, network_type, cache_folder)
+    if response is not None:
+        graph = build_graph(response, center_point, radius, network_type, largest_component)
+    else:
+        import osmnx as ox
+
+        print("Önbellekte uygun Overpass yanıtı yok, graf ağdan indiriliyor...")
+        graph = ox.graph_from_point(center_point, dist=radius, network_type=network_type, retain_all=True)
+        graph = _largest_component(graph, largest_component)
+
+    save_snapshot(graph, path)
+    if not geometry:
+        for _, _, data in graph.edges(data=True):
+            data.pop("geometry", None)
+    return graph
+
+
+# OSM'de highway=traffic_signals etiketli düğümler (tl1.py, o1.py, o2.py'deki ışık adayları)
+def traffic_signal_nodes(graph):
+    return [node for node, data in graph.nodes(data=True) if data.get("highway") == "traffic_signals"]
@@ -0,0 +1,163 @@
+import hashlib
+import heapq
+import os
+
+import numpy as np
+
+# Sorgu başına kullanılan en etkili işaret noktası sayısı
+ACTIVE_LANDMARKS = 4
+
+
+# Grafın yapısından ve kenar uzunluklarından türetilen parmak izi;
+# diskteki önişlenmiş veri başka bir grafa aitse yeniden hesaplanır
+def graph_fingerprint(road):
+    digest = hashlib.sha1()
+    for array in (road.node_ids, road.indptr, road.indices, road.length):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _dijkstra_distances(indptr, indices, weights, source):
+    dist = [float("inf")] * (len(indptr) - 1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        start, end = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[start:end].tolist(), weights[start:end].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return np.array(dist, dtype=np.float64)
+
+
+# A* + işaret noktası (ALT) alt sınırları ile 'length' ağırlıklı en kısa yol.
+# Her işaret noktası L için d(L, v) ve d(v, L) uzaklıkları önceden hesaplanır;
+# üçgen eşitsizliği d(v, t) >= max(d(L, t) - d(L, v), d(v, L) - d(t, L)) A*'ın
+# sezgisel fonksiyonu olur.
+class LandmarkIndex:
+    def __init__(self, road, landmarks, dist_from, dist_to):
+        self.road = road
+        self.landmarks = np.asarray(landmarks, dtype=np.int32)
+        # (düğüm, işaret noktası) düzeninde: bir düğümün tüm sınırları bitişik
+        self.dist_from = np.ascontiguousarray(dist_from, dtype=np.float32)
+        self.dist_to = np.ascontiguousarray(dist_to, dtype=np.float32)
+
+    @classmethod
+    def build(cls, road, num_landmarks=16, rng=None):
+        rng = np.random.default_rng(rng)
+        rev_indptr, rev_indices, rev_edges = road.reverse()
+        rev_length = road.length[rev_edges]
+
+        # En uzak nokta seçimi: her yeni işaret noktası mevcutlara en uzak düğüm
+        landmarks = []
+        dist_from, dist_to = [], []
+        nearest = np.full(road.num_nodes, np.inf)
+        candidate = int(rng.integers(0, road.num_nodes))
+        for _ in range(min(num_landmarks, road.num_nodes)):
+            landmarks.append(candidate)
+            forward = _dijkstra_distances(road.indptr, road.indices, road.length, candidate)
+            backward = _dijkstra_distances(rev_indptr, rev_indices, rev_length, candidate)
+            dist_from.append(forward)
+            dist_to.append(backward)
+            nearest = np.minimum(nearest, forward)
+            score = np.where(np.isfinite(nearest), nearest, -1.0)
+            score[landmarks] = -1.0
+            candidate = int(np.argmax(score))
+            if score[candidate] <= 0:
+                break
+        return cls(road, landmarks, np.stack(dist_from, axis=1), np.stack(dist_to, axis=1))
+
+    def save(self, path):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, fingerprint=np.array(graph_fingerprint(self.road)),
+                 landmarks=self.landmarks, dist_from=self.dist_from, dist_to=self.dist_to)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, road, path):
+        with np.load(path) as data:
+            if data["fingerprint"].item() != graph_fingerprint(road):
+                raise ValueError("Landmark index was built for a different graph")
+            return cls(road, data["landmarks"], data["dist_from"], data["dist_to"])
+
+    # Graf anlık görüntüsünün yanındaki dizini yükle; yoksa ya da eskiyse kur ve kaydet
+    @classmethod
+    def for_snapshot(cls, road, snapshot_path, num_landmarks=16):
+        path = os.path.splitext(snapshot_path)[0] + ".alt.npz"
+        if os.path.exists(path):
+            try:
+                return cls.load(road, path)
+            except ValueError:
+                pass
+        index = cls.build(road, num_landmarks)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        index.save(path)
+        return index
+
+    @property
+    def nbytes(self):
+        return self.dist_from.nbytes + self.dist_to.nbytes
+
+    def shortest_path(self, source, target):
+        if source == target:
+            return [source]
+        # Kaynakta en sıkı sınırı veren işaret noktaları bu sorgu için seçilir
+        k = min(ACTIVE_LANDMARKS, len(self.landmarks))
+        with np.errstate(invalid="ignore"):
+            initial = np.fmax(self.dist_from[target] - self.dist_from[source],
+                              self.dist_to[source] - self.dist_to[target])
+        active = np.argsort(np.nan_to_num(initial, nan=-np.inf))[::-1][:k].tolist()
+        terms = [(j, float(self.dist_from[target, j]), float(self.dist_to[target, j])) for j in active]
+
+        # Alt sınır yalnızca A*'ın dokunduğu düğümler için hesaplanır (sorgu başına sözlük);
+        # satırlar memoryview üzerinden okunur, düğüm başına NumPy çağrısı yapılmaz.
+        # NaN (inf - inf) terimler yok sayılır, erişilemeyen hedef için sınır inf olur.
+        dist_from, dist_to = memoryview(self.dist_from), memoryview(self.dist_to)
+        heuristic = {}
+
+        def bound(v):
+            h = heuristic.get(v)
+            if h is None:
+                h = 0.0
+                for j, from_target, to_target in terms:
+                    x = from_target - dist_from[v, j]
+                    if x > h:
+                        h = x
+                    x = dist_to[v, j] - to_target
+                    if x > h:
+                        h = x
+                heuristic[v] = h
+            return h
+
+        indptr, indices, length = self.road.indptr, self.road.indices, self.road.length
+        dist = {source: 0.0}
+        pred = {source: source}
+        closed = set()
+        heap = [(bound(source), 0.0, source)]
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == target:
+                path = [target]
+                while path[-1] != source:
+                    path.append(pred[path[-1]])
+                path.reverse()
+                return path
+            closed.add(u)
+            du = dist[u]
+            start, end = indptr[u], indptr[u + 1]
+            for v, w in zip(indices[start:end].tolist(), length[start:end].tolist()):
+                nd = du + w
+                if nd < dist.get(v, float("inf")):
+                    h = bound(v)
+                    if h == float("inf"):
+                        continue  # Hedef bu düğümden erişilemez
+                    dist[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd + h, h, v))
+        return None
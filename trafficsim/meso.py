@@ -0,0 +1,216 @@
+import numpy as np
+from scipy import sparse
+
+from .engine import Simulation
+from .signals import SignalPlan, index_signals
+
+# highway sınıfı -> (şerit sayısı, serbest akış hızı m/s); "_link" sınıfları ana sınıfın
+# hızını tek şeritle kullanır, tabloda olmayan sınıflar DEFAULT_HIGHWAY_PARAMS alır
+HIGHWAY_PARAMS = {
+    "motorway": (3, 27.8),
+    "trunk": (2, 22.2),
+    "primary": (2, 16.7),
+    "secondary": (2, 13.9),
+    "tertiary": (1, 11.1),
+    "unclassified": (1, 8.3),
+    "residential": (1, 8.3),
+    "living_street": (1, 2.8),
+    "service": (1, 5.6),
+}
+DEFAULT_HIGHWAY_PARAMS = (1, 5.6)
+SATURATION_FLOW = 0.5  # şerit başına en büyük akış (araç/s, 1800 araç/saat)
+JAM_DENSITY = 0.133  # şerit başına sıkışık yoğunluk (araç/m, araç başına 7.5 m)
+WAVE_SPEED = 5.0  # geri yayılan sıkışma dalgasının hızı (m/s)
+
+
+def highway_params(highway_class):
+    base = highway_class[:-5] if highway_class.endswith("_link") else highway_class
+    lanes, speed = HIGHWAY_PARAMS.get(base, DEFAULT_HIGHWAY_PARAMS)
+    return (1 if base != highway_class else lanes), speed
+
+
+# Grafın tüm traffic_signals düğümlerine (tl1.py'deki gibi düğüm anahtarlı) sabit zamanlı plan
+def traffic_signal_plan(road, red_duration=30, green_duration=30, offset=0):
+    keys = road.node_ids[road.node_signal].tolist()
+    return SignalPlan(keys, red_duration, green_duration, offset)
+
+
+# Mezoskopik (hücre iletim modeli, CTM) simülasyon: bireysel ajan yoktur, her kenar
+# serbest akış hızıyla bir tick'te geçilen uzunlukta hücrelere bölünür ve her hücrede
+# araç sayısı (ondalıklı) tutulur. Hücre kapasiteleri (akış ve depolama) kenarın
+# `length` ve `highway` sınıfından gelir. Kenar sonundaki araçlar düğümün çıkış
+# kenarlarına kapasiteleriyle orantılı dağılır (geri dönüş yalnızca tek seçenekse),
+# `exit_fraction` kadarı yolculuğunu bitirip ağdan çıkar. Düğüm ya da şerit ışığı
+# kırmızıyken kenarın son hücresinden çıkış olmaz. Her tick tüm ağ birkaç seyrek
+# matris çarpımıyla güncellenir:
+#   gönderme S = min(n * v/L, Q),  alma R = min(Q, w/L * (N - n)),
+#   her hücrenin çıkışı S * min_j(R_j / talep_j) (FIFO ayrılma, orantılı birleşme).
+# Yoğunluk, her tick kenardaki araç sayısının toplamıdır (ajan motorlarındaki sayımla
+# aynı birim); density_dict run_simulation'ın sözlük biçimindedir.
+#   initial -> kenar başına başlangıç araç sayısı (dizi) ya da depolamayla orantılı dağıtılan toplam
+#   demand  -> düğüm başına giriş talebi (araç/tick, sayı ya da dizi); yer yoksa girişte bekler
+#   dt      -> bir tick'in saniye karşılığı (hücre boyu = serbest akış hızı x dt)
+#   max_cells -> kenar başına en çok hücre; 1 ise her kenar tek bir kapasiteli kuyruktur
+#                (büyük ağlarda, ör. 20 km yarıçap, hücre sayısını kenar sayısına indirir)
+class MesoSimulation:
+    def __init__(self, road, signals=None, with_traffic_lights=True, initial=0.0, demand=0.0,
+                 exit_fraction=0.1, dt=1.0, max_cells=None):
+        self.road = road
+        self.dt = dt
+        self.max_cells = max_cells
+        self.with_traffic_lights = with_traffic_lights
+        self.exit_fraction = exit_fraction
+        self._build_cells()
+        self._build_transitions()
+        self._build_demand(demand)
+        self.reset(signals, initial)
+
+    def _build_cells(self):
+        road = self.road
+        params = np.array([highway_params(name) for name in road.highway_classes], dtype=np.float64)
+        lanes = params[road.highway, 0]
+        speed = params[road.highway, 1]
+        reach = speed * self.dt  # bir tick'te serbest akışla gidilen mesafe
+        cells = np.maximum(1, np.floor(road.length / reach)).astype(np.int64)
+        if self.max_cells is not None:
+            cells = np.minimum(cells, self.max_cells)
+        self.first_cell = np.cumsum(cells) - cells
+        self.last_cell = self.first_cell + cells - 1
+        self.cell_edge = np.repeat(np.arange(road.num_edges), cells)
+        # Hücre uzunluğu en az bir tick'lik serbest akış mesafesi (kısa kenarlar tek hücre)
+        cell_length = np.repeat(np.maximum(road.length / cells, reach), cells)
+        lanes, reach = lanes[self.cell_edge], reach[self.cell_edge]
+        self.flow_capacity = lanes * SATURATION_FLOW * self.dt
+        self.storage = cell_length * lanes * JAM_DENSITY
+        self.send_ratio = reach / cell_length
+        self.receive_ratio = WAVE_SPEED * self.dt / cell_length
+        self.edge_lanes = params[road.highway, 0]
+
+    # Hücreden hücreye geçiş oranları (seyrek C x C): kenar içi ardışık hücreler 1,
+    # kenar sonundan sonraki kenarların ilk hücrelerine dönüş oranları
+    def _build_transitions(self):
+        road = self.road
+        num_cells = len(self.cell_edge)
+        inner = np.setdiff1d(np.arange(num_cells), self.last_cell, assume_unique=True)
+
+        head = road.indices
+        degree = (road.indptr[head + 1] - road.indptr[head]).astype(np.int64)
+        edge = np.repeat(np.arange(road.num_edges), degree)
+        total = int(degree.sum())
+        group_start = np.cumsum(degree) - degree
+        nxt = np.arange(total) - np.repeat(group_start, degree) + np.repeat(road.indptr[head].astype(np.int64), degree)
+        uturn = road.indices[nxt] == road.edge_u[edge]
+        options = np.bincount(edge, weights=~uturn, minlength=road.num_edges)
+        keep = ~uturn | (options[edge] == 0)
+        edge, nxt = edge[keep], nxt[keep]
+        weight = self.edge_lanes[nxt]
+        weight_sum = np.bincount(edge, weights=weight, minlength=road.num_edges)
+        # Çıkış kenarı olmayan (çıkmaz) kenarların araçları ağdan çıkar
+        dead_end = weight_sum == 0
+        turn = (1 - self.exit_fraction) * weight / weight_sum[edge]
+
+        rows = np.concatenate([inner, self.last_cell[edge]])
+        cols = np.concatenate([inner + 1, self.first_cell[nxt]])
+        values = np.concatenate([np.ones(len(inner)), turn])
+        self.transitions = sparse.csr_matrix((values, (rows, cols)), shape=(num_cells, num_cells))
+        self._incoming = self.transitions.T.tocsr()
+        self.exit_share = np.zeros(num_cells)
+        self.exit_share[self.last_cell] = np.where(dead_end, 1.0, self.exit_fraction)
+
+    # Düğüm talebi, düğümün çıkış kenarlarının ilk hücrelerine şerit sayısıyla orantılı dağıtılır
+    def _build_demand(self, demand):
+        road = self.road
+        demand = np.broadcast_to(np.asarray(demand, dtype=np.float64), (road.num_nodes,))
+        lanes_out = np.bincount(road.edge_u, weights=self.edge_lanes, minlength=road.num_nodes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = demand[road.edge_u] * self.edge_lanes / lanes_out[road.edge_u]
+        rate = np.nan_to_num(rate)
+        sources = np.flatnonzero(rate > 0)
+        self.source_cells = self.first_cell[sources]
+        self.source_rate = rate[sources]
+
+    # Durumu sıfırla; signals verilirse yeni ışık planı kullanılır (ör. yerleşim taraması)
+    def reset(self, signals=None, initial=0.0):
+        if signals is not None or not hasattr(self, "signals"):
+            if signals is None:
+                signals = SignalPlan()
+            elif not isinstance(signals, SignalPlan):
+                signals = SignalPlan.from_lights(signals)
+            self.signals = signals
+            self._index_gates()
+        num_cells = len(self.cell_edge)
+        if np.ndim(initial) == 0:
+            vehicles = self.storage * (float(initial) / self.storage.sum())
+        else:
+            per_edge = np.asarray(initial, dtype=np.float64)
+            cells = self.last_cell - self.first_cell + 1
+            vehicles = (per_edge / cells)[self.cell_edge]
+        self.vehicles = np.minimum(vehicles, self.storage)
+        self.waiting = np.zeros(len(self.source_cells))  # girişte bekleyen talep
+        self.cell_density = np.zeros(num_cells)
+        self.entered = 0.0
+        self.exited = 0.0
+        self.tick = 0
+
+    # Işık yuvalarını kapılanan son hücrelere eşle: düğüm ışığı o düğüme giren tüm
+    # kenarların, şerit ışığı yalnızca kendi kenarının son hücresini kapılar
+    def _index_gates(self):
+        road = self.road
+        node_idx, node_slots, edge_ids, edge_slots = index_signals(road, self.signals.keys())
+        node_slot = np.full(road.num_nodes, -1, dtype=np.int64)
+        node_slot[node_idx] = node_slots
+        into_lit = np.flatnonzero(node_slot[road.indices] >= 0)
+        self._gate_cells = np.concatenate([self.last_cell[into_lit], self.last_cell[edge_ids]])
+        self._gate_slots = np.concatenate([node_slot[road.indices[into_lit]], edge_slots])
+
+    def step(self):
+        if self.with_traffic_lights:
+            self.signals.update()
+        n = self.vehicles
+        send = np.minimum(n * self.send_ratio, self.flow_capacity)
+        if len(self._gate_cells):
+            send[self._gate_cells[~self.signals.green[self._gate_slots]]] = 0.0
+        receive = np.minimum(self.flow_capacity, self.receive_ratio * (self.storage - n))
+        np.maximum(receive, 0.0, out=receive)
+        requested = self._incoming @ send
+        # Talebi alabileceğinden fazla olan hücreler: yukarı akıştaki her hücrenin çıkışı
+        # bağlı olduğu en kısıtlı hücrenin oranıyla ölçeklenir (FIFO)
+        limited = np.flatnonzero(requested > receive)
+        if len(limited):
+            starts = self._incoming.indptr[limited]
+            counts = self._incoming.indptr[limited + 1] - starts
+            offsets = np.arange(int(counts.sum())) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            share = np.ones(len(n))
+            np.minimum.at(share, self._incoming.indices[offsets],
+                          np.repeat(receive[limited] / requested[limited], counts))
+            send *= share
+        inflow = self._incoming @ send
+        self.exited += float(send @ self.exit_share)
+        n += inflow
+        n -= send
+
+        if len(self.source_cells):
+            self.waiting += self.source_rate
+            room = np.maximum(receive[self.source_cells] - inflow[self.source_cells], 0.0)
+            entering = np.minimum(self.waiting, room)
+            self.waiting -= entering
+            n[self.source_cells] += entering
+            self.entered += float(entering.sum())
+        self.cell_density += n
+        self.tick += 1
+
+    def run(self, ticks):
+        for _ in range(ticks):
+            self.step()
+        return self.density_dict()
+
+    # Kenar başına yoğunluk (tick başına araç sayılarının toplamı, float64)
+    @property
+    def density(self):
+        return np.bincount(self.cell_edge, weights=self.cell_density, minlength=self.road.num_edges)
+
+    # Kenar başına o anki araç sayısı
+    def edge_vehicles(self):
+        return np.bincount(self.cell_edge, weights=self.vehicles, minlength=self.road.num_edges)
+
+    density_dict = Simulation.density_dict
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+# Tüm ajanların rotaları tek bir düz int32 tamponda tutulur.
+# Her ajan için tamponda başlangıç ofseti, rota uzunluğu ve rota üzerindeki
+# imleç saklanır; ilerlemek imleci bir artırmaktır (list.pop(0) yerine O(1)).
+# Rotası değişen ajanın eski rotası çöp olarak kalır, çöp canlı veriyi
+# geçtiğinde tampon sıkıştırılır.
+class PathPool:
+    def __init__(self, count, capacity=1024):
+        self.buffer = np.empty(max(capacity, 1), dtype=np.int32)
+        self.reset(count)
+
+    def reset(self, count):
+        self.offset = np.zeros(count, dtype=np.int64)
+        self.length = np.zeros(count, dtype=np.int32)
+        self.cursor = np.zeros(count, dtype=np.int32)
+        self.size = 0  # tamponun kullanılan kısmı
+        self.live = 0  # canlı rotalardaki toplam düğüm sayısı
+
+    def __len__(self):
+        return len(self.offset)
+
+    @property
+    def capacity(self):
+        return len(self.buffer)
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + self.offset.nbytes + self.length.nbytes + self.cursor.nbytes
+
+    # Tamponu en az `capacity` düğüm alacak şekilde önceden ayır
+    def reserve(self, capacity):
+        if capacity > self.capacity:
+            buffer = np.empty(capacity, dtype=np.int32)
+            buffer[:self.size] = self.buffer[:self.size]
+            self.buffer = buffer
+
+    def assign(self, agent, path):
+        path = np.asarray(path, dtype=np.int32)
+        n = len(path)
+        self.live += n - int(self.length[agent])
+        self.length[agent] = 0
+        if self.size + n > self.capacity:
+            if self.size - self.live >= self.live:
+                self.compact()
+            if self.size + n > self.capacity:
+                self.reserve(max(2 * self.capacity, self.size + n))
+        self.buffer[self.size:self.size + n] = path
+        self.offset[agent] = self.size
+        self.length[agent] = n
+        self.cursor[agent] = 0
+        self.size += n
+
+    # Birden çok ajana tek seferde rota ata: rotalar `flat` içinde art arda, uzunlukları `lengths`
+    def assign_flat(self, agents, flat, lengths):
+        lengths = np.asarray(lengths, dtype=np.int32)
+        total = len(flat)
+        self.live += int(lengths.sum()) - int(self.length[agents].sum())
+        self.length[agents] = 0
+        if self.size + total > self.capacity:
+            if self.size - self.live >= self.live:
+                self.compact()
+            if self.size + total > self.capacity:
+                self.reserve(max(2 * self.capacity, self.size + total))
+        self.buffer[self.size:self.size + total] = flat
+        self.offset[agents] = self.size + np.cumsum(lengths, dtype=np.int64) - lengths
+        self.length[agents] = lengths
+        self.cursor[agents] = 0
+        self.size += total
+
+    def clear(self, agent):
+        self.live -= int(self.length[agent])
+        self.length[agent] = 0
+        self.cursor[agent] = 0
+
+    # Canlı rotaları tamponun başına, ofset sırasını koruyarak taşı
+    def compact(self):
+        agents = np.flatnonzero(self.length > 0)
+        agents = agents[np.argsort(self.offset[agents], kind="stable")]
+        lengths = self.length[agents].astype(np.int64)
+        new_offsets = np.zeros(len(agents), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=new_offsets[1:])
+        total = int(lengths.sum())
+        source = np.repeat(self.offset[agents] - new_offsets, lengths) + np.arange(total)
+        self.buffer[:total] = self.buffer[source]
+        self.offset[agents] = new_offsets
+        self.size = total
+
+    def advance(self, agents):
+        self.cursor[agents] += 1
+
+    # İmlecin gösterdiği düğümden sonraki düğüm; rota bittiyse -1
+    def next_node(self, agents=slice(None)):
+        nxt = self.cursor[agents] + 1
+        length = self.length[agents]
+        ok = nxt < length
+        idx = self.offset[agents] + np.where(ok, nxt, 0)
+        return np.where(ok, self.buffer[idx], -1).astype(np.int32)
+
+    # Ajanın tam rotası (tampon üzerinde görünüm, kopya değil)
+    def path(self, agent):
+        start = self.offset[agent]
+        return self.buffer[start:start + self.length[agent]]
+
+    def remaining(self, agent):
+        start = self.offset[agent]
+        return self.buffer[start + self.cursor[agent]:start + self.length[agent]]
@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Çalışma fazları, raporda bu sırayla gösterilir (bilinmeyen fazlar sona eklenir)
+PHASES = ("signals", "masks", "routing", "collision", "movement", "density", "draw", "frame_wait")
+
+
+# Simülasyon döngüsünün faz süreleri ve sayaçları.
+# Motor ve bileşenler her fazın sonunda lap(faz) çağırır; her lap bir önceki lap'ten
+# bu yana geçen monotonik süreyi o faza yazar, böylece fazlar tick süresini örtüşmeden
+# böler. Profiler bağlı değilse (Simulation(profiler=None)) her faz noktasında yalnızca
+# bir None kontrolü kalır.
+#   allocations=True   -> tick başına net ayrılmış bellek bloğu (sys.getallocatedblocks)
+#   sample_window=(a, b), sample_path -> [a, b) tick aralığında yığın örnekleyicisi çalışır
+#                        ve yığınlar katlanmış (flame graph) biçimde sample_path'e yazılır
+class Profiler:
+    def __init__(self, allocations=False, sample_window=None, sample_path="profile.folded",
+                 sample_interval=0.001):
+        self.allocations = allocations
+        self.sample_window = sample_window
+        self.sample_path = sample_path
+        self.sample_interval = sample_interval
+        self.totals = Counter()  # faz -> nanosaniye
+        self.counters = Counter()
+        self.ticks = 0
+        self.allocated_blocks = []  # tick başına net blok değişimi
+        self._last = None
+        self._blocks = 0
+        self._sampler = None
+
+    def reset(self):
+        self.totals.clear()
+        self.counters.clear()
+        self.ticks = 0
+        self.allocated_blocks = []
+        self._last = None
+
+    # Yeni tick başlar; önceki tick (gözlemciler dahil) burada kapanır
+    def begin_tick(self, tick):
+        self._close_tick()
+        if self.sample_window is not None:
+            start, stop = self.sample_window
+            if tick == start and self._sampler is None:
+                # Simülasyonu çalıştıran iş parçacığı örneklenir
+                self._sampler = StackSampler(self.sample_interval, threading.get_ident()).start()
+            elif tick == stop and self._sampler is not None:
+                self._stop_sampler()
+        if self.allocations:
+            self._blocks = sys.getallocatedblocks()
+        self._last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        self.totals[phase] += now - self._last
+        self._last = now
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def _close_tick(self):
+        if self._last is None:
+            return
+        self.ticks += 1
+        if self.allocations:
+            self.allocated_blocks.append(sys.getallocatedblocks() - self._blocks)
+        self._last = None
+
+    def finish(self):
+        self._close_tick()
+        if self._sampler is not None:
+            self._stop_sampler()
+
+    def _stop_sampler(self):
+        self._sampler.stop()
+        self._sampler.write(self.sample_path)
+        self._sampler = None
+
+    def phase_seconds(self):
+        order = [p for p in PHASES if p in self.totals] + sorted(set(self.totals) - set(PHASES))
+        return {phase: self.totals[phase] / 1e9 for phase in order}
+
+    # compare_densities çıktısının yanında basılacak metin rapor
+    def report(self, router=None):
+        seconds = self.phase_seconds()
+        total = sum(seconds.values())
+        lines = [f"Profil: {self.ticks} tick, {total:.3f} s"]
+        for phase, value in seconds.items():
+            share = value / total * 100 if total else 0.0
+            per_tick = value / self.ticks * 1e3 if self.ticks else 0.0
+            lines.append(f"  {phase:<24} {value:9.3f} s  {per_tick:8.3f} ms/tick  %{share:5.1f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:<24} {value}")
+        if router is not None:
+            stats = router.stats()
+            lines.append(f"  {'route_cache_hit_rate':<24} {stats['hit_rate']:.3f} "
+                         f"({stats['hits']} isabet, {stats['misses']} ıska)")
+        if self.allocated_blocks:
+            blocks = self.allocated_blocks
+            lines.append(f"  {'allocated_blocks/tick':<24} ort {sum(blocks) / len(blocks):.1f}, "
+                         f"en çok {max(blocks)}")
+        return "\n".join(lines)
+
+
+# Bir iş parçacığının (varsayılan: ana iş parçacığı) yığınını sabit aralıklarla örnekleyen arka plan iş parçacığı.
+# Yığınlar "dosya:fonksiyon;dosya:fonksiyon ... sayı" satırları (katlanmış yığın
+# biçimi; flamegraph.pl, speedscope vb. okur) olarak yazılır.
+class StackSampler:
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,190 @@
+import numpy as np
+
+# Renk tanımları
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 255, 0)
+YELLOW = (255, 255, 0)
+RED = (255, 0, 0)
+
+# Yoğunluk kovası -> kenar rengi
+BUCKET_COLORS = (GREEN, YELLOW, RED)
+
+# Bu sayıdan fazla kirli dikdörtgen varsa tüm ekranı çevirmek daha ucuz
+MAX_DIRTY_RECTS = 512
+
+AGENT_RADIUS = 3
+LIGHT_RADIUS = 10
+
+
+# Simülasyonu pygame penceresinde gösteren gözlemci. pygame yalnızca görünüm
+# başlatıldığında içe aktarılır; ekransız çalıştırmalar ona hiç dokunmaz.
+# Yol katmanı bir kez önbellek yüzeyine çizilir; her karede yalnızca yoğunluk
+# kovası (yeşil/sarı/kırmızı) değişen kenarlar yeniden çizilir. Ajanlar ve
+# ışıklar önceden çizilmiş küçük yüzeylerden toplu blit ile basılır ve ekranda
+# sadece değişen dikdörtgenler güncellenir.
+class PygameView:
+    def __init__(self, road, screen_size=(800, 800), caption="Trafik Simülasyonu", fps=10,
+                 thresholds=(5, 15), hide_reached=False, undirected=False):
+        self.road = road
+        self.screen_size = screen_size
+        self.caption = caption
+        self.fps = fps
+        self.thresholds = thresholds  # yoğunluk < t0 yeşil, < t1 sarı, değilse kırmızı
+        self.hide_reached = hide_reached  # o2.py'de hedefe ulaşan ajanlar çizilmez
+        # o1.py'de kenar rengi iki yöndeki yoğunluğun toplamından belirlenir
+        self.undirected = undirected
+        self.node_positions = road.pixel_positions(screen_size).tolist()
+        self.screen = None
+        self.clock = None
+        self.background = None  # önbellekteki yol katmanı
+        self.bucket = None  # her kenarın son çizilen yoğunluk kovası
+        self._sprite_rects = []  # önceki karede ajan/ışık basılan dikdörtgenler
+        self._sprites = None
+        self._light_positions = {}
+
+    def on_start(self, sim):
+        import pygame
+
+        if self.screen is None:
+            pygame.init()
+            self.screen = pygame.display.set_mode(self.screen_size)
+            pygame.display.set_caption(self.caption)
+            self._sprites = {color: self._dot(color, radius)
+                             for color, radius in ((BLUE, AGENT_RADIUS), (GREEN, LIGHT_RADIUS),
+                                                   (RED, LIGHT_RADIUS))}
+        self.clock = pygame.time.Clock()
+
+        # Her aşamanın başında yol katmanını baştan kur
+        self.bucket = self.buckets(sim.density)
+        self.background = pygame.Surface(self.screen_size).convert()
+        self.background.fill(WHITE)
+        self._draw_edges(np.arange(self.road.num_edges))
+        self.screen.blit(self.background, (0, 0))
+        self._sprite_rects = []
+        pygame.display.flip()
+
+    @staticmethod
+    def _dot(color, radius):
+        import pygame
+
+        surface = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+        surface.fill(WHITE)
+        surface.set_colorkey(WHITE)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        return surface.convert()
+
+    # Kenar yoğunluklarını renk kovalarına çevir (0 yeşil, 1 sarı, 2 kırmızı)
+    def buckets(self, density):
+        if self.undirected:
+            pairs = self.road.undirected_ids()
+            density = np.bincount(pairs, weights=density)[pairs]
+        return np.searchsorted(self.thresholds, density, side="right").astype(np.int8)
+
+    def _draw_edges(self, edges):
+        import pygame
+
+        positions = self.node_positions
+        rects = []
+        for u, v, bucket in zip(self.road.edge_u[edges].tolist(), self.road.indices[edges].tolist(),
+                                self.bucket[edges].tolist()):
+            rects.append(pygame.draw.line(self.background, BUCKET_COLORS[bucket],
+                                          positions[u], positions[v], 3))
+        return rects
+
+    def _light_position(self, key):
+        position = self._light_positions.get(key)
+        if position is None:
+            node = key[0] if isinstance(key, tuple) else key
+            position = self.node_positions[self.road.node_index(node)]
+            self._light_positions[key] = position
+        return position
+
+    def _blit_dots(self, sprite, points, radius):
+        return self.screen.blits([(sprite, (x - radius, y - radius)) for x, y in points], doreturn=True)
+
+    # Çok sayıda ajanı tek seferde piksellere bas: ajan merkezleri bir maske
+    # görüntüsüne yazılır, maske daire şablonuyla genişletilir ve ekran piksel
+    # dizisine tek atamayla basılır (maliyet ajan sayısından bağımsız).
+    def _stamp_dots(self, pos, color, radius):
+        import pygame
+
+        width, height = self.screen_size
+        xy = pos.astype(np.int64)
+        keep = (xy[:, 0] >= -radius) & (xy[:, 0] < width + radius) & \
+               (xy[:, 1] >= -radius) & (xy[:, 1] < height + radius)
+        centers = np.zeros((width + 4 * radius, height + 4 * radius), dtype=bool)
+        centers[xy[keep, 0] + 2 * radius, xy[keep, 1] + 2 * radius] = True
+        dots = np.zeros((width, height), dtype=bool)
+        for ox in range(-radius, radius + 1):
+            for oy in range(-radius, radius + 1):
+                if ox * ox + oy * oy <= radius * radius:
+                    dots |= centers[2 * radius - ox:2 * radius - ox + width,
+                                    2 * radius - oy:2 * radius - oy + height]
+        pixels = pygame.surfarray.pixels2d(self.screen)
+        pixels[dots] = self.screen.map_rgb(color)
+        del pixels  # yüzey kilidini bırak
+
+    # Pencereyi kapat; sonraki on_start yeni bir pencere açar (o1.py/o2.py aşamaları)
+    def close(self):
+        import pygame
+
+        pygame.quit()
+        self.screen = None
+
+    def on_tick(self, sim):
+        import pygame
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False  # Çıkış olayını işleyip döngüyü bitir
+
+        screen, background = self.screen, self.background
+
+        # Kovası değişen kenarları yol katmanında yeniden çiz
+        bucket = self.buckets(sim.density)
+        changed = np.flatnonzero(bucket != self.bucket)
+        self.bucket = bucket
+        dirty = self._draw_edges(changed)
+
+        # Önceki karenin ajan/ışık izlerini ve değişen kenarları yol katmanından geri yükle;
+        # çok sayıda dikdörtgen varsa tek bir tam ekran blit daha ucuzdur
+        dirty.extend(self._sprite_rects)
+        full_frame = len(dirty) + len(sim.agents) > MAX_DIRTY_RECTS
+        if full_frame:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in dirty:
+                screen.blit(background, rect, rect)
+
+        # Trafik ışıklarını çiz
+        sprite_rects = []
+        if sim.with_traffic_lights and sim.signals:
+            green, red = [], []
+            for key, is_green in zip(sim.signals.keys(), sim.green_states().tolist()):
+                (green if is_green else red).append(self._light_position(key))
+            sprite_rects += self._blit_dots(self._sprites[GREEN], green, LIGHT_RADIUS)
+            sprite_rects += self._blit_dots(self._sprites[RED], red, LIGHT_RADIUS)
+
+        # Ajanları çiz (mavi noktalar)
+        agents = sim.agents
+        pos = agents.pos[~agents.reached] if self.hide_reached else agents.pos
+        if full_frame and self.screen.get_bytesize() in (1, 2, 4):
+            self._stamp_dots(pos, BLUE, AGENT_RADIUS)
+        else:
+            sprite_rects += self._blit_dots(self._sprites[BLUE], pos.astype(int).tolist(), AGENT_RADIUS)
+
+        if full_frame:
+            self._sprite_rects = []
+            pygame.display.flip()
+        else:
+            dirty.extend(sprite_rects)
+            self._sprite_rects = sprite_rects
+            pygame.display.update(dirty)
+        if sim.profiler is not None:
+            sim.profiler.lap("draw")
+        self.clock.tick(self.fps)  # Simülasyon hızını ayarlar
+        if sim.profiler is not None:
+            sim.profiler.lap("frame_wait")
+        return True
@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+
+
+# Işık yerleşimi durumları için sabit bellekli Q değer tablosu.
+# Durumlar sıralı int32 düğüm indeksi dizilerine (kanonik biçim) çevrilir, yani aynı
+# düğüm kümesinin farklı sıraları aynı kayıttır. Kayıtlar önceden ayrılmış bir açık
+# adresleme (doğrusal yoklama) tablosunda tutulur: anahtarlar (yuva x state_size) int32,
+# değerler (yuva x aksiyon) float32. Kayıt sayısı `capacity`'ye ulaşınca yeni kayıt için
+# rastgele seçilen birkaç kayıttan en düşük değerlisi atılır (en iyi kayıt hiç atılmaz).
+# En iyi kayıt (en büyük Q) her yazmada güncellenir; best() tabloyu taramaz.
+class QTable:
+    def __init__(self, state_size, num_actions=2, capacity=1 << 18, max_load=0.7,
+                 evict_sample=8, rng=None):
+        if capacity < 2:
+            raise ValueError("QTable capacity must be at least 2")
+        self.state_size = state_size
+        self.num_actions = num_actions
+        self.capacity = capacity
+        self.evict_sample = evict_sample
+        slots = 1
+        while slots * max_load < capacity:
+            slots *= 2
+        self.mask = slots - 1
+        self.keys = np.zeros((slots, state_size), dtype=np.int32)
+        self.values = np.zeros((slots, num_actions), dtype=np.float32)
+        self.home = np.zeros(slots, dtype=np.int64)  # kaydın yoklamaya başladığı yuva
+        self.used = np.zeros(slots, dtype=bool)
+        self.rng = np.random.default_rng(rng)
+        self._mult = (np.random.default_rng(0x9E3779B9).integers(1, 1 << 62, state_size,
+                                                                 dtype=np.uint64) | 1)
+        self.size = 0
+        self.evictions = 0
+        self.best_slot = -1
+        self.best_value = -np.inf
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.values.nbytes + self.home.nbytes + self.used.nbytes
+
+    def canonical(self, state):
+        key = np.sort(np.asarray(state, dtype=np.int32))
+        if len(key) != self.state_size:
+            raise ValueError(f"Expected {self.state_size} nodes, got {len(key)}")
+        return key
+
+    def _hash(self, key):
+        h = int((key.astype(np.uint64) * self._mult).sum())
+        h ^= h >> 29
+        h = (h * 0xBF58476D1CE4E5B9) & _MASK64
+        h ^= h >> 32
+        return h & self.mask
+
+    # Kanonik anahtarın yuvası; yoksa (-1, anahtarın yerleşeceği boş yuva)
+    def _find(self, key):
+        i = self._hash(key)
+        while self.used[i]:
+            if np.array_equal(self.keys[i], key):
+                return i, i
+            i = (i + 1) & self.mask
+        return -1, i
+
+    def __contains__(self, state):
+        return self._find(self.canonical(state))[0] >= 0
+
+    # Durumun Q değerleri (kopya); tabloda yoksa sıfırlar (eski sözlükteki np.zeros(2))
+    def get(self, state):
+        slot, _ = self._find(self.canonical(state))
+        if slot < 0:
+            return np.zeros(self.num_actions, dtype=np.float32)
+        return self.values[slot].copy()
+
+    # Durumun en büyük Q değeri; tabloda yoksa 0
+    def max_value(self, state):
+        slot, _ = self._find(self.canonical(state))
+        return float(self.values[slot].max()) if slot >= 0 else 0.0
+
+    # Q(state, action) = value; durum yoksa eklenir (gerekirse bir kayıt atılarak)
+    def set(self, state, action, value):
+        key = self.canonical(state)
+        slot, free = self._find(key)
+        if slot < 0:
+            if self.size >= self.capacity:
+                self._evict()
+                free = self._find(key)[1]
+            slot = free
+            self.keys[slot] = key
+            self.values[slot] = 0.0
+            self.home[slot] = self._hash(key)
+            self.used[slot] = True
+            self.size += 1
+        self.values[slot, action] = value
+        self._track(slot)
+        return slot
+
+    def _track(self, slot):
+        value = float(self.values[slot].max())
+        if value > self.best_value:
+            self.best_slot, self.best_value = slot, value
+        elif slot == self.best_slot and value < self.best_value:
+            # En iyi kaydın değeri düştü: yalnızca bu durumda tablo yeniden taranır
+            self._rescan()
+
+    def _rescan(self):
+        if not self.size:
+            self.best_slot, self.best_value = -1, -np.inf
+            return
+        scores = np.where(self.used, self.values.max(axis=1), -np.inf)
+        self.best_slot = int(np.argmax(scores))
+        self.best_value = float(scores[self.best_slot])
+
+    # Rastgele `evict_sample` dolu yuvadan en düşük değerli kaydı sil
+    def _evict(self):
+        candidates = []
+        while len(candidates) < self.evict_sample:
+            i = int(self.rng.integers(0, self.mask + 1))
+            if self.used[i] and i != self.best_slot:
+                candidates.append(i)
+        victim = min(candidates, key=lambda i: float(self.values[i].max()))
+        self._delete(victim)
+        self.evictions += 1
+
+    # Doğrusal yoklamada mezar taşı bırakmadan silme: sonraki kayıtlar boşluğa geri kaydırılır
+    def _delete(self, i):
+        j = i
+        while True:
+            j = (j + 1) & self.mask
+            if not self.used[j]:
+                break
+            k = self.home[j]
+            # j'deki kayıt, yoklaması i'yi geçmeden ulaşılamayacaksa i'ye taşınır
+            if (i <= j and not i < k <= j) or (i > j and j < k <= i):
+                self.keys[i] = self.keys[j]
+                self.values[i] = self.values[j]
+                self.home[i] = k
+                if self.best_slot == j:
+                    self.best_slot = i
+                i = j
+        self.used[i] = False
+        self.size -= 1
+
+    # En iyi durum (sıralı düğüm indeksleri) ve Q değerleri; tablo boşsa None
+    def best(self):
+        if self.best_slot < 0:
+            return None
+        return self.keys[self.best_slot].copy(), self.values[self.best_slot].copy()
+
+    # Tüm kayıtlar (anahtarlar, değerler) olarak, yuva sırasıyla
+    def items(self):
+        return self.keys[self.used].copy(), self.values[self.used].copy()
+
+    # Tabloyu tek bir .npz dosyasına kaydet (geçici dosyaya yazılıp yerine taşınır;
+    # yazma sırasında kesilen bir kayıt önceki kontrol noktasını bozmaz). meta: ör. episode sayısı
+    def save(self, path, **meta):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, keys=self.keys, values=self.values, home=self.home, used=self.used,
+                 header=np.array([self.capacity, self.size, self.evictions, self.best_slot]),
+                 best_value=np.array(self.best_value), **{"meta_" + k: np.asarray(v) for k, v in meta.items()})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, rng=None):
+        with np.load(path) as data:
+            keys, values = data["keys"], data["values"]
+            capacity, size, evictions, best_slot = data["header"].tolist()
+            table = cls(keys.shape[1], values.shape[1], capacity=capacity, rng=rng)
+            if len(keys) != len(table.keys):
+                raise ValueError("Checkpoint slot count does not match")
+            table.keys[:], table.values[:] = keys, values
+            table.home[:], table.used[:] = data["home"], data["used"]
+            table.size, table.evictions, table.best_slot = size, evictions, best_slot
+            table.best_value = float(data["best_value"])
+            meta = {k[5:]: data[k].item() for k in data.files if k.startswith("meta_")}
+        return table, meta
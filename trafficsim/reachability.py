@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .road_graph import hop_distances, strongly_connected_components
+
+
+# Yalnızca erişilebilir hedefleri çeken örnekleyici.
+# Düğümler güçlü bağlı bileşenlere (SCC) ayrılır; bir kaynaktan erişilebilen
+# düğümler, kaynağın bileşeninden yoğunlaştırılmış DAG'da erişilebilen
+# bileşenlerin birleşimidir. Hedef önce boyutla ağırlıklı bileşen, sonra bileşen
+# içinde düzgün dağılımla seçilir; deneme-yanılma ve başarısız arama yoktur.
+# min_hops verilirse kaynak başına atlama uzaklığı bantları (tl1.py'deki
+# ">= 150 düğüm" koşulu) önbelleğe alınır ve yalnızca yeterince uzak hedefler çekilir.
+class TargetSampler:
+    # labels: önceden hesaplanmış SCC etiketleri (ör. süreçler arasında paylaşılan)
+    def __init__(self, road, max_bands=256, labels=None):
+        self.road = road
+        self.labels = strongly_connected_components(road) if labels is None else labels
+        self.num_components = int(self.labels.max()) + 1 if len(self.labels) else 0
+
+        # Düğümleri bileşene göre grupla (CSR düzeni)
+        self.component_nodes = np.argsort(self.labels, kind="stable").astype(np.int32)
+        self.component_indptr = np.zeros(self.num_components + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.labels, minlength=self.num_components), out=self.component_indptr[1:])
+
+        # Yoğunlaştırılmış DAG kenarları
+        cu, cv = self.labels[road.edge_u], self.labels[road.indices]
+        cross = cu != cv
+        pairs = np.unique(cu[cross].astype(np.int64) * self.num_components + cv[cross])
+        self._dag = {}
+        for a, b in zip((pairs // self.num_components).tolist(), (pairs % self.num_components).tolist()):
+            self._dag.setdefault(a, []).append(b)
+
+        self._closures = {}
+        self.max_bands = max_bands
+        self._bands = OrderedDict()
+
+    def component_size(self, component):
+        return int(self.component_indptr[component + 1] - self.component_indptr[component])
+
+    # Bileşenden erişilebilen bileşenler ve boyutlarının kümülatif toplamı
+    def _closure(self, component):
+        closure = self._closures.get(component)
+        if closure is None:
+            seen = {component}
+            stack = [component]
+            while stack:
+                for nxt in self._dag.get(stack.pop(), ()):
+                    if nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            components = np.array(sorted(seen), dtype=np.int32)
+            sizes = self.component_indptr[components + 1] - self.component_indptr[components]
+            closure = (components, np.cumsum(sizes))
+            self._closures[component] = closure
+        return closure
+
+    def reachable_count(self, source):
+        return int(self._closure(int(self.labels[source]))[1][-1])
+
+    # Kaynaktan atlama uzaklığına göre sıralı erişilebilir düğümler ve uzaklıkları
+    def _hop_bands(self, source):
+        bands = self._bands.get(source)
+        if bands is not None:
+            self._bands.move_to_end(source)
+            return bands
+        hops = hop_distances(self.road, source)
+        reachable = np.flatnonzero(hops > 0)
+        order = np.argsort(hops[reachable], kind="stable")
+        bands = (reachable[order].astype(np.int32), hops[reachable][order])
+        self._bands[source] = bands
+        if len(self._bands) > self.max_bands:
+            self._bands.popitem(last=False)
+        return bands
+
+    # Kaynaktan erişilebilen, kaynaktan farklı rastgele bir hedef; yoksa -1
+    def sample(self, source, rng, min_hops=0):
+        if min_hops > 1:
+            nodes, hops = self._hop_bands(source)
+            start = int(np.searchsorted(hops, min_hops))
+            if start >= len(nodes):
+                return -1
+            return int(nodes[rng.integers(start, len(nodes))])
+
+        components, cumulative = self._closure(int(self.labels[source]))
+        total = int(cumulative[-1])
+        if total <= 1:
+            return -1
+        while True:
+            k = int(rng.integers(0, total))
+            c = int(np.searchsorted(cumulative, k, side="right"))
+            before = int(cumulative[c - 1]) if c else 0
+            component = components[c]
+            target = int(self.component_nodes[self.component_indptr[component] + k - before])
+            if target != source:
+                return target
+
+
+# Süreç genelinde graf başına tek örnekleyici (graf ile birlikte serbest kalır)
+def shared_sampler(road):
+    return road.shared("sampler", lambda: TargetSampler(road))
@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+from .agents import AgentPopulation
+from .engine import Simulation
+from .reachability import TargetSampler, shared_sampler
+from .road_graph import RoadGraph
+from .routing import Router
+from .signals import SignalPlan
+from .sweep import attach_arrays, share_road
+
+
+# aa.py'deki ödül fonksiyonu: ışıklar yoğunluğu azalttıysa yüzde ödül, değilse ceza
+def reward_function(initial_density, final_density):
+    if final_density < initial_density:
+        return (initial_density - final_density) / initial_density * 100
+    return -10
+
+
+# Aday ışık yerleşimlerini toplu olarak değerlendirir.
+# Graf batch_size + 1 kez kopyalanır (RoadGraph.tile); blok 0 ışıksız karşılaştırma,
+# blok b (1..batch_size) b. adayın ışıklarıyla çalışır. Tüm bloklar tek bir
+# AgentPopulation ve tek bir Simulation ile birlikte `horizon` tick ilerletilir, yani
+# bir partideki tüm adaylar aynı vektörel adımları paylaşır. Her partide ajan havuzu
+# yeniden oluşturulmaz, yalnızca sıfırlanır. Başlangıç düğümleri ve rotalar bir kez
+# (tek kopya üzerinde) çekilip tüm bloklara kaydırılarak kopyalanır: her aday aynı
+# trafik talebiyle karşılaştırılır ve rota maliyeti blok sayısıyla artmaz.
+class LightSetEvaluator:
+    def __init__(self, road, num_agents=550, batch_size=32, horizon=50, red_duration=10,
+                 green_duration=10, rng=None, sampler=None):
+        self.road = road
+        self.num_agents = num_agents
+        self.batch_size = batch_size
+        self.horizon = horizon
+        self.red_duration = red_duration
+        self.green_duration = green_duration
+        self.rng = np.random.default_rng(rng)
+        self.sampler = sampler if sampler is not None else shared_sampler(road)
+        # Kaynak başına en kısa yol ağacı; başlangıç düğümleri partiler arasında tekrarlandıkça isabet eder
+        self.router = Router(road, mode="tree", max_trees=road.num_nodes)
+
+        copies = batch_size + 1
+        self.tiled = road.tile(copies)
+        components = self.sampler.num_components
+        labels = (self.sampler.labels[None, :] + np.arange(copies)[:, None] * components).ravel()
+        self.agents = AgentPopulation(self.tiled, num_agents * copies, rng=self.rng,
+                                      sampler=TargetSampler(self.tiled, labels=labels.astype(np.int32)))
+        self._shifts = np.arange(copies, dtype=np.int64) * road.num_nodes
+        self.episodes = 0
+
+    # Rastgele üreteci yeniden tohumla (ör. her aktör partisi kendi tohumuyla tekrarlanabilir)
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.agents.rng = self.rng
+
+    # Tek kopya için başlangıç düğümleri ve rotalar (düz dizi + uzunluklar)
+    def _demand(self):
+        starts = self.rng.integers(0, self.road.num_nodes, self.num_agents)
+        paths = []
+        for source in starts.tolist():
+            target = self.sampler.sample(source, self.rng)
+            path = None if target < 0 else self.router.route(source, target)
+            paths.append([source] if path is None else path)
+        lengths = np.fromiter(map(len, paths), dtype=np.int32, count=len(paths))
+        return starts, np.concatenate(paths).astype(np.int64), lengths
+
+    # states: (aday, ışık) yoğun düğüm indeksleri, en fazla batch_size aday.
+    # (ışıksız toplam yoğunluk, aday başına ışıklı toplam yoğunluk) döndürür.
+    def evaluate(self, states):
+        states = [np.asarray(state, dtype=np.int64) for state in states]
+        if len(states) > self.batch_size:
+            raise ValueError(f"At most {self.batch_size} light sets per batch")
+
+        starts, flat, lengths = self._demand()
+        copies = len(self._shifts)
+        self.agents.reset(positions=(self._shifts[:, None] + starts[None, :]).ravel())
+        self.agents.assign_paths(np.arange(len(self.agents)), (self._shifts[:, None] + flat[None, :]).ravel(),
+                                 np.tile(lengths, copies))
+
+        keys = [self.tiled.osm_id(state + shift) for state, shift in zip(states, self._shifts[1:])]
+        keys = np.unique(np.concatenate(keys)) if keys else np.zeros(0, dtype=np.int64)
+        plan = SignalPlan(keys.tolist(), self.red_duration, self.green_duration)
+        simulation = Simulation(self.tiled, self.agents, plan, with_traffic_lights=True)
+        simulation.run(ticks=self.horizon)
+
+        totals = simulation.density.reshape(copies, -1).sum(axis=1, dtype=np.int64)
+        self.episodes += len(states)
+        return int(totals[0]), totals[1:len(states) + 1]
+
+
+# Bir parti için rastgele yerleşimleri çekip değerlendirir: (yerleşimler, ışıksız, ışıklı yoğunluklar)
+def rollout_batch(evaluator, seed, count, num_lights):
+    evaluator.seed(seed)
+    states = np.stack([evaluator.rng.choice(evaluator.road.num_nodes, num_lights, replace=False)
+                       for _ in range(count)]).astype(np.int32)
+    baseline, densities = evaluator.evaluate(states)
+    return states, baseline, densities
+
+
+# Aktör sürecinin durumu: paylaşımlı bellekteki graftan kurulan değerlendirici
+_actor = {}
+
+
+def _init_actor(spec, highway_classes, evaluator_kwargs):
+    block, arrays = attach_arrays(spec)
+    road = RoadGraph.from_arrays(arrays, highway_classes)
+    _actor["block"] = block
+    _actor["evaluator"] = LightSetEvaluator(road, sampler=TargetSampler(road, labels=arrays["scc_labels"]),
+                                            **evaluator_kwargs)
+
+
+def _actor_rollout(job):
+    return rollout_batch(_actor["evaluator"], *job)
+
+
+# Aktör/öğrenici düzeni için rollout akışı. `episodes` episode, batch_size'lık partiler
+# hâlinde `workers` aktör sürecine dağıtılır; her parti kendi tohumuyla (seed + parti no)
+# simüle edilir ve (yerleşimler, ışıksız, ışıklı yoğunluklar) olarak parti sırasıyla
+# döner. Q tablosu aktörlere gönderilmez: her iki aksiyonun ödülü de rollout'tan
+# hesaplanabildiği için aksiyonu ve güncellemeyi tek öğrenici (çağıran) uygular.
+# Graf ve erişilebilirlik tabloları sweep.py'deki gibi paylaşımlı bellekle dağıtılır.
+# workers=0 ise partiler aynı süreçte üretilir.
+def parallel_rollouts(road, episodes, workers=None, batch_size=32, num_lights=15, seed=0,
+                      start=0, **evaluator_kwargs):
+    jobs = [(seed + index, min(batch_size, episodes - first), num_lights)
+            for index, first in enumerate(range(0, episodes, batch_size))]
+    jobs = jobs[start // batch_size:]
+    evaluator_kwargs["batch_size"] = batch_size
+    if workers == 0:
+        evaluator = LightSetEvaluator(road, **evaluator_kwargs)
+        for job in jobs:
+            yield rollout_batch(evaluator, *job)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    shared, highway_classes = share_road(road)
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_actor,
+                                  initargs=(shared.spec, highway_classes, evaluator_kwargs)) as pool:
+            yield from pool.imap(_actor_rollout, jobs)
+    finally:
+        shared.close()
@@ -0,0 +1,412 @@
+import heapq
+
+import numpy as np
+
+# Yol sınıfı bilinmeyen kenarlar için kullanılan değer
+DEFAULT_HIGHWAY = "residential"
+
+# RoadGraph dizileri: (dizi adı, öznitelik adı), kurucu argüman sırasıyla
+ARRAY_FIELDS = (
+    ("node_ids", "node_ids"), ("x", "x"), ("y", "y"), ("node_signal", "node_signal"),
+    ("indptr", "indptr"), ("edge_u", "edge_u"), ("edge_v", "indices"), ("edge_key", "edge_key"),
+    ("length", "length"), ("highway", "highway"), ("pair_keys", "_pair_keys"),
+)
+
+
+def _first(value):
+    # osmnx sadeleştirmesinden sonra nitelikler liste olabilir, ilkini al
+    if isinstance(value, list):
+        return value[0]
+    return value
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+# osmnx MultiDiGraph'ın değişmez, dizi tabanlı (CSR) görünümü.
+# OSM düğüm kimlikleri sıralı tutulur ve 0..n-1 arası int32 indekslere eşlenir;
+# kenarlar (u, v, key) sırasına göre dizilir, kenar kimliği bu sıradaki konumdur.
+class RoadGraph:
+    def __init__(self, node_ids, x, y, node_signal, indptr, edge_u, edge_v, edge_key,
+                 length, highway, highway_classes, pair_keys=None):
+        self.node_ids = _readonly(node_ids)
+        self.x = _readonly(x)
+        self.y = _readonly(y)
+        self.node_signal = _readonly(node_signal)
+        self.indptr = _readonly(indptr)
+        self.edge_u = _readonly(edge_u)
+        self.indices = _readonly(edge_v)
+        self.edge_key = _readonly(edge_key)
+        self.length = _readonly(length)
+        self.highway = _readonly(highway)
+        self.highway_classes = tuple(highway_classes)
+        # (u, v) çiftleri için sıralı birleşik anahtar, toplu kenar araması için
+        if pair_keys is None:
+            pair_keys = self.edge_u.astype(np.int64) * len(node_ids) + self.indices
+        self._pair_keys = _readonly(pair_keys)
+        self._reverse = None
+        # Graf başına paylaşılan hizmetler (shared_router, shared_sampler); graf serbest
+        # kalınca onlarla birlikte serbest kalır
+        self._shared = {}
+        self._undirected = None
+
+    @classmethod
+    def from_networkx(cls, graph):
+        node_ids = np.fromiter(graph.nodes, dtype=np.int64, count=len(graph))
+        node_ids.sort()
+        n = len(node_ids)
+        x = np.empty(n, dtype=np.float64)
+        y = np.empty(n, dtype=np.float64)
+        node_signal = np.zeros(n, dtype=bool)
+        for i, node in enumerate(node_ids.tolist()):
+            data = graph.nodes[node]
+            x[i] = data["x"]
+            y[i] = data["y"]
+            node_signal[i] = data.get("highway") == "traffic_signals"
+
+        edges = list(graph.edges(keys=True, data=True))
+        m = len(edges)
+        us = np.searchsorted(node_ids, np.fromiter((e[0] for e in edges), dtype=np.int64, count=m))
+        vs = np.searchsorted(node_ids, np.fromiter((e[1] for e in edges), dtype=np.int64, count=m))
+        keys = np.fromiter((e[2] for e in edges), dtype=np.int32, count=m)
+        lengths = np.fromiter((e[3].get("length", 0.0) for e in edges), dtype=np.float64, count=m)
+        highway_names = [str(_first(e[3].get("highway", DEFAULT_HIGHWAY))) for e in edges]
+        highway_classes, highway = np.unique(np.array(highway_names, dtype=str), return_inverse=True)
+
+        order = np.lexsort((keys, vs, us))
+        edge_u = us[order].astype(np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(edge_u, minlength=n), out=indptr[1:])
+        return cls(
+            node_ids, x, y, node_signal, indptr, edge_u, vs[order].astype(np.int32),
+            keys[order], lengths[order], highway[order].astype(np.int8), highway_classes.tolist(),
+        )
+
+    # Grafı oluşturan diziler (ad -> dizi); from_arrays ile kopyasız geri kurulur
+    # (ör. paylaşımlı bellekteki görünümlerden, bkz. sweep.py)
+    def arrays(self):
+        return {name: getattr(self, attr) for name, attr in ARRAY_FIELDS}
+
+    @classmethod
+    def from_arrays(cls, arrays, highway_classes):
+        return cls(*(arrays[name] for name, _ in ARRAY_FIELDS[:10]), highway_classes,
+                   pair_keys=arrays["pair_keys"])
+
+    # Grafın `copies` adet ayrık kopyasından oluşan blok köşegen graf. b. kopyanın
+    # düğüm indeksleri b * num_nodes, kenar kimlikleri b * num_edges kaydırılmıştır;
+    # OSM kimlikleri de sıralı ve benzersiz kalacak şekilde kaydırılır. Birbirinden
+    # bağımsız senaryolar tek bir vektörel simülasyonda çalıştırılabilir (bkz. rl.py).
+    def tile(self, copies):
+        n, m = self.num_nodes, self.num_edges
+        blocks = np.arange(copies, dtype=np.int64)
+        node_ids = (self.node_ids[None, :] + blocks[:, None] * (int(self.node_ids.max()) + 1)).ravel()
+        indptr = np.concatenate([self.indptr[:-1][None, :] + blocks[:, None] * m, [[copies * m]]],
+                                axis=None).astype(np.int32)
+        shift = (blocks * n).astype(np.int32)[:, None]
+        return RoadGraph(
+            node_ids, np.tile(self.x, copies), np.tile(self.y, copies),
+            np.tile(self.node_signal, copies), indptr,
+            (self.edge_u[None, :] + shift).ravel(), (self.indices[None, :] + shift).ravel(),
+            np.tile(self.edge_key, copies), np.tile(self.length, copies),
+            np.tile(self.highway, copies), self.highway_classes,
+        )
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        arrays = [self.node_ids, self.x, self.y, self.node_signal, self.indptr, self.edge_u,
+                  self.indices, self.edge_key, self.length, self.highway, self._pair_keys]
+        return sum(a.nbytes for a in arrays)
+
+    # OSM kimliği <-> yoğun indeks dönüşümleri
+    def node_index(self, osm_ids):
+        osm_ids = np.asarray(osm_ids, dtype=np.int64)
+        idx = np.searchsorted(self.node_ids, osm_ids)
+        idx = np.minimum(idx, self.num_nodes - 1)
+        if np.any(self.node_ids[idx] != osm_ids):
+            raise KeyError("Node not in graph")
+        return idx.astype(np.int32) if idx.ndim else int(idx)
+
+    def osm_id(self, indices):
+        result = self.node_ids[indices]
+        return result if np.ndim(result) else int(result)
+
+    def neighbors(self, u):
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def out_edges(self, u):
+        return range(self.indptr[u], self.indptr[u + 1])
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    # (u, v) için en küçük anahtarlı kenarın kimliği; kenar yoksa -1
+    def edge_ids(self, us, vs):
+        pair = np.asarray(us, dtype=np.int64) * self.num_nodes + np.asarray(vs, dtype=np.int64)
+        pos = np.searchsorted(self._pair_keys, pair)
+        found = pos < self.num_edges
+        found[found] = self._pair_keys[pos[found]] == pair[found]
+        return np.where(found, pos, -1).astype(np.int32)
+
+    def edge_id(self, u, v):
+        return int(self.edge_ids(np.array([u]), np.array([v]))[0])
+
+    def has_edge(self, u, v):
+        return self.edge_id(u, v) >= 0
+
+    # Kenar kimliklerini run_simulation'daki (u, v, key) sözlük anahtarlarına çevir
+    def edge_tuples(self):
+        return list(zip(self.node_ids[self.edge_u].tolist(), self.node_ids[self.indices].tolist(),
+                        self.edge_key.tolist()))
+
+    # Her kenarın yönsüz (u, v) çift kimliği: iki yöndeki ve paralel kenarlar aynı kimliği
+    # alır (o1.py'nin ilk sürümündeki tuple(sorted((u, v))) anahtarları gibi)
+    def undirected_ids(self):
+        if self._undirected is None:
+            lo = np.minimum(self.edge_u, self.indices).astype(np.int64)
+            hi = np.maximum(self.edge_u, self.indices).astype(np.int64)
+            _, inverse = np.unique(lo * self.num_nodes + hi, return_inverse=True)
+            self._undirected = inverse.astype(np.int32)
+        return self._undirected
+
+    def edge_highway(self, edge):
+        return self.highway_classes[self.highway[edge]]
+
+    # `key` için paylaşılan nesne; yoksa factory() ile kurulur. Kayıt grafın kendisinde
+    # tutulur: modül düzeyinde bir sözlük grafı (ve yönlendirici önbelleğini) süreç
+    # boyunca canlı tutardı, zayıf anahtarlı sözlük de değer grafa başvurduğu için tutar.
+    def shared(self, key, factory):
+        value = self._shared.get(key)
+        if value is None:
+            value = self._shared[key] = factory()
+        return value
+
+    # Ters yönlü CSR (gelen kenarlar); ilk kullanımda hesaplanır
+    def reverse(self):
+        if self._reverse is None:
+            order = np.argsort(self.indices, kind="stable").astype(np.int32)
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
+            np.cumsum(np.bincount(self.indices, minlength=self.num_nodes), out=indptr[1:])
+            self._reverse = (indptr, self.edge_u[order], order)
+        return self._reverse
+
+    # scale_coordinates ile aynı ölçekleme, tüm düğümler için tek seferde
+    def pixel_positions(self, screen_size):
+        width, height = (screen_size, screen_size) if np.isscalar(screen_size) else screen_size
+        return np.stack([_scale(self.x, width), _scale(self.y, height)], axis=1).astype(np.int32)
+
+    def shortest_path(self, source, target, weight=None):
+        if weight is None:
+            return bfs_path(self, source, target)
+        if weight != "length":
+            raise ValueError(f"Unsupported weight {weight!r}")
+        return dijkstra_path(self, source, target)
+
+
+# Tek bir koordinatı [min_val, max_val] aralığından ekran pikseline ölçekle
+# (pixel_positions'ın tek değerlik karşılığı; aralık sıfırsa ekranın ortası)
+def scale_coordinates(coord, min_val, max_val, screen_size):
+    try:
+        return int((coord - min_val) / (max_val - min_val) * screen_size)
+    except ZeroDivisionError:
+        return screen_size // 2
+
+
+def _scale(coords, size):
+    min_val, max_val = coords.min(), coords.max()
+    if max_val - min_val == 0:
+        return np.full(len(coords), size // 2)
+    return ((coords - min_val) / (max_val - min_val) * size).astype(np.int64)
+
+
+def _reconstruct(pred, source, target):
+    path = [target]
+    while path[-1] != source:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+
+# Ağırlıksız en kısa yol (nx.shortest_path(graph, s, t) karşılığı); yol yoksa None
+def bfs_path(road, source, target):
+    if source == target:
+        return [source]
+    indptr, indices = road.indptr, road.indices
+    pred = [-1] * road.num_nodes
+    pred[source] = source
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for u in frontier:
+            for v in indices[indptr[u]:indptr[u + 1]].tolist():
+                if pred[v] < 0:
+                    pred[v] = u
+                    if v == target:
+                        return _reconstruct(pred, source, target)
+                    next_frontier.append(v)
+        frontier = next_frontier
+    return None
+
+
+# 'length' ağırlıklı en kısa yol (weight='length' karşılığı); yol yoksa None
+def dijkstra_path(road, source, target):
+    indptr, indices, length = road.indptr, road.indices, road.length
+    dist = [float("inf")] * road.num_nodes
+    pred = [-1] * road.num_nodes
+    dist[source] = 0.0
+    pred[source] = source
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u == target:
+            return _reconstruct(pred, source, target)
+        if d > dist[u]:
+            continue
+        start, end = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[start:end].tolist(), length[start:end].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return None
+
+
+# Kaynaktan erişilebilen tüm düğümler için öncül dizisi (int32).
+# pred[source] == source, erişilemeyen düğümler için -1.
+def shortest_path_tree(road, source, weight=None):
+    if weight is None:
+        return _bfs_tree(road, source)
+    if weight != "length":
+        raise ValueError(f"Unsupported weight {weight!r}")
+    return _dijkstra_tree(road, source)
+
+
+def _bfs_tree(road, source):
+    # Seviye seviye, vektörel genişlik öncelikli arama
+    indptr, indices = road.indptr, road.indices
+    pred = np.full(road.num_nodes, -1, dtype=np.int32)
+    pred[source] = source
+    frontier = np.array([source], dtype=np.int32)
+    while len(frontier):
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        owners = np.repeat(frontier, counts)
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        neighbors = indices[offsets]
+        fresh = pred[neighbors] < 0
+        neighbors, owners = neighbors[fresh], owners[fresh]
+        neighbors, first = np.unique(neighbors, return_index=True)
+        pred[neighbors] = owners[first]
+        frontier = neighbors
+    return pred
+
+
+def _dijkstra_tree(road, source):
+    indptr, indices, length = road.indptr, road.indices, road.length
+    dist = [float("inf")] * road.num_nodes
+    pred = [-1] * road.num_nodes
+    dist[source] = 0.0
+    pred[source] = source
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        start, end = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[start:end].tolist(), length[start:end].tolist()):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+    return np.array(pred, dtype=np.int32)
+
+
+# Öncül ağacından hedefe giden yolu geri yürüyerek çıkar; erişilemiyorsa None
+def path_from_tree(pred, source, target):
+    if pred[target] < 0:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(int(pred[path[-1]]))
+    path.reverse()
+    return path
+
+
+# Kaynaktan her düğüme atlama (düğüm) sayısı; erişilemeyen düğümler için -1
+def hop_distances(road, source):
+    indptr, indices = road.indptr, road.indices
+    hops = np.full(road.num_nodes, -1, dtype=np.int32)
+    hops[source] = 0
+    frontier = np.array([source], dtype=np.int32)
+    level = 0
+    while len(frontier):
+        level += 1
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        neighbors = np.unique(indices[offsets])
+        frontier = neighbors[hops[neighbors] < 0]
+        hops[frontier] = level
+    return hops
+
+
+# Güçlü bağlı bileşen etiketleri (yinelemeli Kosaraju); bileşenler 0..k-1
+def strongly_connected_components(road):
+    n = road.num_nodes
+    indptr, indices = road.indptr.tolist(), road.indices.tolist()
+    rev_indptr, rev_indices, _ = road.reverse()
+    rev_indptr, rev_indices = rev_indptr.tolist(), rev_indices.tolist()
+
+    # 1. geçiş: ileri grafta bitiş sırası
+    visited = [False] * n
+    order = []
+    for root in range(n):
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack = [(root, indptr[root])]
+        while stack:
+            u, i = stack[-1]
+            if i < indptr[u + 1]:
+                stack[-1] = (u, i + 1)
+                v = indices[i]
+                if not visited[v]:
+                    visited[v] = True
+                    stack.append((v, indptr[v]))
+            else:
+                stack.pop()
+                order.append(u)
+
+    # 2. geçiş: ters grafta, bitiş sırasının tersinden etiketleme
+    labels = [-1] * n
+    count = 0
+    for root in reversed(order):
+        if labels[root] >= 0:
+            continue
+        labels[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in rev_indices[rev_indptr[u]:rev_indptr[u + 1]]:
+                if labels[v] < 0:
+                    labels[v] = count
+                    stack.append(v)
+        count += 1
+    return np.array(labels, dtype=np.int32)
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .road_graph import path_from_tree, shortest_path_tree
+
+# Önbellekteki her kayıt için dizinin kendisi dışındaki yaklaşık yük (bayt)
+ENTRY_OVERHEAD = 160
+
+
+# Yönlendirme kipleri:
+#   "pair" -> her (source, target) sorgusu ayrı aranır ve sonucu önbelleğe alınır
+#   "tree" -> kaynak başına tüm en kısa yol ağacı (int32 öncül dizisi) bir kez
+#             hesaplanır; aynı kaynaktan sonraki her hedef ağaçtan okunur
+ROUTER_MODES = ("pair", "tree")
+
+
+# En kısa yol servisi: sorgular (source, target, weight) anahtarıyla ("tree" kipinde
+# (source, weight) ağaçları) bellek sınırlı bir LRU önbellekte tutulur. Rotalar
+# yalnızca graf ve ağırlığa bağlıdır, ışıklara bağlı değildir; bu yüzden ışık eklenince
+# ya da durumları değişince (tl1.py'nin aşamaları, kontrolörler) önbellek geçerli kalır.
+# Yol bulunamayan sorgular da (None) önbelleğe alınır.
+# Aynı süreçteki tüm simülasyonlar shared_router() ile aynı örneği paylaşır.
+class Router:
+    def __init__(self, road, mode="pair", max_bytes=64 * 1024 * 1024, max_entries=None,
+                 max_trees=256, landmarks=None):
+        if mode not in ROUTER_MODES:
+            raise ValueError(f"Unrecognized mode {mode!r}")
+        self.road = road
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_trees = max_trees
+        # İsteğe bağlı ALT dizini (landmarks.LandmarkIndex): 'length' sorgularını hızlandırır
+        self.landmarks = landmarks
+        self._cache = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def route(self, source, target, weight=None):
+        if self.mode == "tree":
+            return self._route_tree(source, target, weight)
+        key = (source, target, weight)
+        cache = self._cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.hits += 1
+            return cache[key]
+
+        self.misses += 1
+        if weight == "length" and self.landmarks is not None:
+            path = self.landmarks.shortest_path(source, target)
+        else:
+            path = self.road.shortest_path(source, target, weight)
+        if path is not None:
+            path = np.asarray(path, dtype=np.int32)
+            path.setflags(write=False)
+        self._store(key, path)
+        return path
+
+    # Ağaçlar tembel kurulur; max_trees aşılırsa en eski kullanılan ağaç atılır
+    def tree(self, source, weight=None):
+        key = (source, weight)
+        cache = self._cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.hits += 1
+            return cache[key]
+
+        self.misses += 1
+        pred = shortest_path_tree(self.road, source, weight)
+        pred.setflags(write=False)
+        cache[key] = pred
+        self.bytes += ENTRY_OVERHEAD + pred.nbytes
+        while len(cache) > self.max_trees or self.bytes > self.max_bytes:
+            _, old = cache.popitem(last=False)
+            self.bytes -= ENTRY_OVERHEAD + old.nbytes
+            self.evictions += 1
+        return pred
+
+    def _route_tree(self, source, target, weight):
+        path = path_from_tree(self.tree(source, weight), source, target)
+        return None if path is None else np.asarray(path, dtype=np.int32)
+
+    def _store(self, key, path):
+        size = ENTRY_OVERHEAD + (0 if path is None else path.nbytes)
+        self._cache[key] = path
+        self.bytes += size
+        while self._cache and (self.bytes > self.max_bytes or
+                               (self.max_entries is not None and len(self._cache) > self.max_entries)):
+            _, old = self._cache.popitem(last=False)
+            self.bytes -= ENTRY_OVERHEAD + (0 if old is None else old.nbytes)
+            self.evictions += 1
+
+    def clear(self):
+        self._cache.clear()
+        self.bytes = 0
+
+    def stats(self):
+        queries = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._cache),
+            "bytes": self.bytes,
+            "hit_rate": self.hits / queries if queries else 0.0,
+        }
+
+
+# Süreç genelinde graf ve kip başına tek yönlendirici (tl1.py'nin iki aşaması dahil);
+# graf ile birlikte serbest kalır. Var olan yönlendiriciyle çelişen ayarlar hata verir
+# (sessizce eski ayarlarla devam edilmez).
+def shared_router(road, mode="pair", **kwargs):
+    router = road.shared(("router", mode), lambda: Router(road, mode=mode, **kwargs))
+    conflicts = sorted(name for name, value in kwargs.items() if getattr(router, name) is not value
+                       and getattr(router, name) != value)
+    if conflicts:
+        raise ValueError(f"Shared router already exists with different {', '.join(conflicts)}")
+    return router
@@ -0,0 +1,135 @@
+import numpy as np
+
+
+# Tek bir trafik ışığı (eski nesne tabanlı arayüz). Her update() çağrısında
+# zamanlayıcı artar ve süre dolunca durum değişir. Çok sayıda ışık için
+# SignalPlan kullanılır; SignalPlan.from_lights bu nesnelerden plan kurar.
+class TrafficLight:
+    def __init__(self, position, red_duration=10, green_duration=10):
+        self.position = position
+        self.state = "red"  # İlk durumda kırmızı
+        self.timer = 0
+        self.red_duration = red_duration  # Kırmızı ışık süresi
+        self.green_duration = green_duration  # Yeşil ışık süresi
+
+    def update(self):
+        self.timer += 1
+        # Süreye göre ışık değiştir
+        if self.state == "red" and self.timer >= self.red_duration:
+            self.state = "green"
+            self.timer = 0
+        elif self.state == "green" and self.timer >= self.green_duration:
+            self.state = "red"
+            self.timer = 0
+
+    def is_green(self):
+        return self.state == "green"
+
+
+# Sabit zamanlı sinyal planı: tüm ışıkların kırmızı/yeşil süreleri ve ofsetleri
+# NumPy dizilerinde tutulur; her ışığın durumu tick sayısından kapalı formda
+# hesaplanır: p = (tick + offset) mod (kırmızı + yeşil), p < kırmızı ise kırmızı.
+# Bu, TrafficLight.update() zinciriyle birebir aynı durum dizisini verir.
+# Süresi 0 olan (döngüsüz) ışıklar zamanlayıcıyla değişmez; durumları dışarıdan
+# set_state ile verilir (ör. o1.py/o2.py kontrolörü).
+# Anahtarlar TrafficLight sözlükleriyle aynıdır: düğüm (tl1.py) ya da (u, v) şerit (o2.py).
+class SignalPlan:
+    def __init__(self, keys=(), red_duration=10, green_duration=10, offset=0):
+        self._keys = list(keys)
+        self._slots = {key: slot for slot, key in enumerate(self._keys)}
+        n = len(self._keys)
+        self.red_duration = np.broadcast_to(np.asarray(red_duration, dtype=np.int64), (n,)).copy()
+        self.green_duration = np.broadcast_to(np.asarray(green_duration, dtype=np.int64), (n,)).copy()
+        self.offset = np.broadcast_to(np.asarray(offset, dtype=np.int64), (n,)).copy()
+        self.tick = 0
+        self.green = np.zeros(n, dtype=bool)
+        self._refresh()
+
+    # TrafficLight sözlüğünden, ışıkların o anki zamanlayıcı durumunu koruyarak plan kur
+    @classmethod
+    def from_lights(cls, lights):
+        plan = cls()
+        for key, light in lights.items():
+            plan.add(key, light.red_duration, light.green_duration)
+            slot = plan.slot(key)
+            plan.offset[slot] += light.timer + (light.red_duration if light.is_green() else 0)
+        plan._refresh()
+        return plan
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def keys(self):
+        return list(self._keys)
+
+    def slot(self, key):
+        return self._slots[key]
+
+    # Işıkların o tick'teki yeşil durumu (döngüsüz ışıklar mevcut durumunu korur)
+    def states_at(self, tick):
+        cycle = self.red_duration + self.green_duration
+        timed = cycle > 0
+        green = self.green.copy()
+        green[timed] = (tick + self.offset[timed]) % cycle[timed] >= self.red_duration[timed]
+        return green
+
+    def _refresh(self):
+        self.green = self.states_at(self.tick)
+
+    # Tüm ışıkları `ticks` adım ilerlet (TrafficLight.update'in toplu karşılığı)
+    def update(self, ticks=1):
+        self.tick += ticks
+        self._refresh()
+
+    # Yeni ışık ekle ya da mevcut ışığı değiştir; ışık şu andan itibaren kırmızı başlar
+    def add(self, key, red_duration=10, green_duration=10, offset=0):
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._slots[key] = slot
+            self.red_duration = np.append(self.red_duration, 0)
+            self.green_duration = np.append(self.green_duration, 0)
+            self.offset = np.append(self.offset, 0)
+            self.green = np.append(self.green, False)
+        self.red_duration[slot] = red_duration
+        self.green_duration[slot] = green_duration
+        self.offset[slot] = offset - self.tick
+        self.green[slot] = False
+        self._refresh()
+        return slot
+
+    def is_green(self, key):
+        return bool(self.green[self._slots[key]])
+
+    def state(self, key):
+        return "green" if self.is_green(key) else "red"
+
+    # Döngüsüz ışıkların durumunu dışarıdan ata (slots: indeks dizisi, green: bool dizisi)
+    def set_state(self, slots, green):
+        self.green[slots] = green
+
+
+# Işık anahtarlarını yoğun indekslere eşle: düğüm anahtarları (tl1.py) ve (u, v) şerit
+# anahtarları (o2.py) ayrılır. (düğüm indeksleri, düğüm ışık yuvaları, kenar kimlikleri,
+# kenar ışık yuvaları) döndürür; yuvalar anahtarların sırasıyladır.
+def index_signals(road, keys):
+    node_keys, node_slots, edge_us, edge_vs, edge_slots = [], [], [], [], []
+    for slot, key in enumerate(keys):
+        if isinstance(key, tuple):
+            edge_us.append(key[0])
+            edge_vs.append(key[1])
+            edge_slots.append(slot)
+        else:
+            node_keys.append(key)
+            node_slots.append(slot)
+    node_idx = road.node_index(np.array(node_keys, dtype=np.int64))
+    edge_ids = road.edge_ids(road.node_index(np.array(edge_us, dtype=np.int64)),
+                             road.node_index(np.array(edge_vs, dtype=np.int64)))
+    return node_idx, np.array(node_slots, dtype=np.int64), edge_ids, np.array(edge_slots, dtype=np.int64)
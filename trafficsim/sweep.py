@@ -0,0 +1,236 @@
+import csv
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .agents import AgentPopulation
+from .engine import Simulation
+from .reachability import TargetSampler, shared_sampler
+from .road_graph import RoadGraph
+from .signals import SignalPlan
+
+# Sonuç tablosunun sütunları (senaryo başına bir satır)
+RESULT_FIELDS = ("scenario", "placement", "lights", "agents", "seed", "ticks",
+                 "total_density", "reached_percentage", "seconds")
+
+
+# Tek bir senaryo: ışık yerleşimi (düğüm ya da (u, v) şerit anahtarları), ajan sayısı,
+# tohum ve tick sayısı. Boş yerleşim ışıksız karşılaştırma çalıştırmasıdır.
+class Scenario:
+    def __init__(self, placement, lights, agents, seed, ticks, red_duration=15, green_duration=15,
+                 mode="hop", weight=None):
+        self.placement = placement
+        self.lights = list(lights)
+        self.agents = agents
+        self.seed = seed
+        self.ticks = ticks
+        self.red_duration = red_duration
+        self.green_duration = green_duration
+        self.mode = mode
+        self.weight = weight
+
+    def __repr__(self):
+        return (f"Scenario({self.placement!r}, lights={len(self.lights)}, agents={self.agents}, "
+                f"seed={self.seed}, ticks={self.ticks})")
+
+
+# Yerleşimler x ajan sayıları x tohumlar çapraz çarpımı.
+# placements: {ad: ışık anahtarları}; ışıksız çalıştırma için {"none": []}
+def scenario_grid(placements, agent_counts, seeds, ticks, **kwargs):
+    return [Scenario(name, lights, count, seed, ticks, **kwargs)
+            for name, lights in placements.items()
+            for count in agent_counts
+            for seed in seeds]
+
+
+# Numpy dizilerini tek bir paylaşımlı bellek bloğuna yerleştirir. spec (blok adı ve
+# dizi düzeni) küçük ve seçilebilir (picklable) olduğundan işçilere yalnızca o gönderilir;
+# işçiler diziler için bloğa kopyasız görünüm açar.
+class SharedArrays:
+    def __init__(self, arrays):
+        layout = []
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            offset = -(-offset // 64) * 64  # 64 bayt hizalama
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self.block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, dtype, shape, start), array in zip(layout, arrays.values()):
+            view = np.ndarray(shape, dtype=dtype, buffer=self.block.buf, offset=start)
+            view[...] = array
+        self.spec = (self.block.name, layout)
+
+    def close(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# spec'teki bloğa bağlan; (blok, {ad: salt okunur dizi}) döndürür. Blok nesnesi
+# diziler kullanıldığı sürece canlı tutulmalıdır.
+def attach_arrays(spec):
+    name, layout = spec
+    block = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for array_name, dtype, shape, start in layout:
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        array.setflags(write=False)
+        arrays[array_name] = array
+    return block, arrays
+
+
+# Grafın ve erişilebilirlik tablolarının (SCC etiketleri) paylaşımlı kopyası
+def share_road(road):
+    arrays = road.arrays()
+    arrays["scc_labels"] = shared_sampler(road).labels
+    return SharedArrays(arrays), road.highway_classes
+
+
+# İşçi sürecinin durumu: paylaşımlı bellekten kurulan graf ve örnekleyici
+_worker = {}
+
+
+def _init_worker(spec, highway_classes):
+    block, arrays = attach_arrays(spec)
+    road = RoadGraph.from_arrays(arrays, highway_classes)
+    _worker["block"] = block
+    _worker["road"] = road
+    _worker["sampler"] = TargetSampler(road, labels=arrays["scc_labels"])
+
+
+def run_scenario(road, sampler, scenario, index=0):
+    started = time.perf_counter()
+    plan = SignalPlan()
+    for key in scenario.lights:
+        plan.add(key, red_duration=scenario.red_duration, green_duration=scenario.green_duration)
+    agents = AgentPopulation(road, scenario.agents, mode=scenario.mode, weight=scenario.weight,
+                             rng=scenario.seed, sampler=sampler)
+    simulation = Simulation(road, agents, plan, with_traffic_lights=len(plan) > 0)
+    simulation.run(ticks=scenario.ticks)
+    return {
+        "scenario": index,
+        "placement": scenario.placement,
+        "lights": len(plan),
+        "agents": scenario.agents,
+        "seed": scenario.seed,
+        "ticks": scenario.ticks,
+        "total_density": simulation.accumulator.total,
+        "reached_percentage": simulation.reached_stats()["reached_percentage"],
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _run_indexed(job):
+    index, scenario = job
+    return run_scenario(_worker["road"], _worker["sampler"], scenario, index)
+
+
+# Senaryoları bir süreç havuzunda çalıştırır ve senaryo sırasıyla sonuç satırları döndürür.
+# Graf dizileri ve SCC etiketleri bir kez paylaşımlı belleğe yazılır; işçilere
+# senaryo başına yalnızca Scenario nesnesi gönderilir. processes=0 ise aynı süreçte çalışır.
+def run_sweep(road, scenarios, processes=None, chunksize=1):
+    jobs = list(enumerate(scenarios))
+    if processes == 0:
+        sampler = shared_sampler(road)
+        return [run_scenario(road, sampler, scenario, index) for index, scenario in jobs]
+
+    processes = processes or os.cpu_count() or 1
+    shared, highway_classes = share_road(road)
+    try:
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(shared.spec, highway_classes)) as pool:
+            rows = list(pool.imap_unordered(_run_indexed, jobs, chunksize=chunksize))
+    finally:
+        shared.close()
+    rows.sort(key=lambda row: row["scenario"])
+    return rows
+
+
+# Satırları yerleşim ve ajan sayısına göre tohumlar üzerinden özetle (ortalama ve std)
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["placement"], row["agents"]), []).append(row)
+    summary = []
+    for (placement, agents), group in groups.items():
+        density = np.array([row["total_density"] for row in group], dtype=np.float64)
+        reached = np.array([row["reached_percentage"] for row in group], dtype=np.float64)
+        summary.append({
+            "placement": placement,
+            "agents": agents,
+            "runs": len(group),
+            "total_density_mean": float(density.mean()),
+            "total_density_std": float(density.std()),
+            "reached_percentage_mean": float(reached.mean()),
+            "reached_percentage_std": float(reached.std()),
+        })
+    return summary
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# tl1.py: en yoğun `count` kenarın düğümleri; tl.py/hayat.py: sıralamanın orta üçte biri
+def edge_placement(road, density, count=15, band="top"):
+    order = np.argsort(-np.asarray(density), kind="stable")
+    if band == "mid":
+        order = order[len(order) // 3:2 * len(order) // 3]
+    elif band != "top":
+        raise ValueError(f"Unrecognized band {band!r}")
+    edges = order[:count]
+    nodes = np.concatenate([road.edge_u[edges], road.indices[edges]])
+    return list(dict.fromkeys(road.osm_id(nodes).tolist()))
+
+
+# o2.py: rastgele `count` düğümün tüm çıkış şeritleri, (u, v) anahtarlarıyla
+def random_lane_placement(road, count=20, rng=None):
+    rng = np.random.default_rng(rng)
+    nodes = rng.choice(road.num_nodes, size=min(count, road.num_nodes), replace=False)
+    lanes = []
+    for u in nodes.tolist():
+        for v in road.neighbors(u).tolist():
+            lanes.append((road.osm_id(u), road.osm_id(v)))
+    return list(dict.fromkeys(lanes))
+
+
+# Örnek: tl1.py grafında ışıksız, en yoğun ve orta yoğun yerleşimler, birkaç tohumla
+def main():
+    from .graph_loader import load_graph
+
+    graph = load_graph((40.759348, 30.363582), 1250, network_type='all', largest_component='weak')
+    road = RoadGraph.from_networkx(graph)
+
+    baseline = Simulation(road, AgentPopulation(road, 550, rng=0))
+    baseline.run(ticks=300)
+    placements = {
+        "none": [],
+        "top15": edge_placement(road, baseline.density, 15, "top"),
+        "mid15": edge_placement(road, baseline.density, 15, "mid"),
+    }
+    scenarios = scenario_grid(placements, agent_counts=[550, 1100], seeds=range(4), ticks=300)
+
+    started = time.perf_counter()
+    rows = run_sweep(road, scenarios)
+    print(f"{len(rows)} senaryo {time.perf_counter() - started:.1f} saniyede tamamlandı")
+    for row in summarize(rows):
+        print(row)
+    write_csv(rows, "sweep_results.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from .road_graph import RoadGraph
+
+# Ana yol aralığı: her `ARTERIAL_EVERY` satır/sütun (ızgara) ya da ışın (radyal) ana yoldur
+ARTERIAL_EVERY = 10
+HIGHWAY_CLASSES = ["primary", "residential"]
+
+
+# Yönlü kenar listesinden RoadGraph kur (koordinatlar metre, uzunluklar Öklid mesafesi).
+# Kenarlar iki yönlü eklenir; ana yolların kesiştiği düğümler trafik ışığı sayılır.
+def _build(x, y, us, vs, arterial, node_signal):
+    us, vs = np.concatenate([us, vs]), np.concatenate([vs, us])
+    arterial = np.concatenate([arterial, arterial])
+    order = np.lexsort((vs, us))
+    us, vs, arterial = us[order].astype(np.int32), vs[order].astype(np.int32), arterial[order]
+    n = len(x)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(us, minlength=n), out=indptr[1:])
+    length = np.hypot(x[vs] - x[us], y[vs] - y[us])
+    highway = np.where(arterial, 0, 1).astype(np.int8)
+    node_ids = np.arange(1, n + 1, dtype=np.int64)
+    return RoadGraph(node_ids, x, y, node_signal, indptr, us, vs, np.zeros(len(us), dtype=np.int32),
+                     length, highway, HIGHWAY_CLASSES)
+
+
+# Yaklaşık `num_nodes` düğümlü kare ızgara şehir (blok kenarı `spacing` metre)
+def grid_graph(num_nodes, spacing=100.0):
+    side = max(2, int(round(np.sqrt(num_nodes))))
+    rows, cols = np.divmod(np.arange(side * side), side)
+    x, y = cols * spacing, rows * spacing
+    node = np.arange(side * side).reshape(side, side)
+    us = np.concatenate([node[:, :-1].ravel(), node[:-1, :].ravel()])
+    vs = np.concatenate([node[:, 1:].ravel(), node[1:, :].ravel()])
+    arterial = np.concatenate([(rows[node[:, :-1]] % ARTERIAL_EVERY == 0).ravel(),
+                               (cols[node[:-1, :]] % ARTERIAL_EVERY == 0).ravel()])
+    node_signal = (rows % ARTERIAL_EVERY == 0) & (cols % ARTERIAL_EVERY == 0)
+    return _build(x.astype(np.float64), y.astype(np.float64), us, vs, arterial, node_signal)
+
+
+# Yaklaşık `num_nodes` düğümlü radyal şehir: merkezden `spokes` ışın ve eş merkezli halkalar
+# (verilmezse ışın sayısı halka sayısına yakın seçilir)
+def radial_graph(num_nodes, spokes=None, spacing=100.0):
+    if spokes is None:
+        spokes = max(8, int(np.sqrt(num_nodes)) // 4 * 4)
+    rings = max(1, (num_nodes - 1) // spokes)
+    ring, spoke = np.divmod(np.arange(rings * spokes), spokes)
+    angle = spoke * (2 * np.pi / spokes)
+    radius = (ring + 1) * spacing
+    x = np.concatenate([[0.0], radius * np.cos(angle)])
+    y = np.concatenate([[0.0], radius * np.sin(angle)])
+    node = 1 + np.arange(rings * spokes).reshape(rings, spokes)
+    # Işınlar: merkez -> ilk halka ve halkadan halkaya; halkalar: komşu ışınlar arası
+    spoke_u = np.concatenate([np.zeros(spokes, dtype=np.int64), node[:-1].ravel()])
+    spoke_v = np.concatenate([node[0], node[1:].ravel()])
+    ring_u, ring_v = node.ravel(), np.roll(node, -1, axis=1).ravel()
+    us, vs = np.concatenate([spoke_u, ring_u]), np.concatenate([spoke_v, ring_v])
+    spoke_arterial = np.concatenate([np.arange(spokes), np.tile(np.arange(spokes), rings - 1)]) % 4 == 0
+    ring_arterial = np.repeat(np.arange(rings) % ARTERIAL_EVERY == ARTERIAL_EVERY - 1, spokes)
+    arterial = np.concatenate([spoke_arterial, ring_arterial])
+    node_signal = np.concatenate([[True], (ring % ARTERIAL_EVERY == ARTERIAL_EVERY - 1) & (spoke % 4 == 0)])
+    return _build(x, y, us, vs, arterial, node_signal)
@@ -0,0 +1,160 @@
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+TELEMETRY_FORMATS = ("jsonl", "binary")
+
+# İkili kayıtta her tick için sabit alanlar; ardından ışık başına kuyruk uzunlukları gelir
+RECORD_FIELDS = [
+    ("tick", "<i8"),
+    ("density", "<i8"),  # bu tick'te sayılan kenar yoğunluğu
+    ("total_density", "<i8"),  # başlangıçtan beri toplam yoğunluk
+    ("moving", "<i4"),
+    ("stopped", "<i4"),
+    ("reached", "<i4"),
+    ("mean_stuck_steps", "<f4"),
+]
+
+
+def record_dtype(num_signals):
+    return np.dtype(RECORD_FIELDS + [("queues", "<i4", (num_signals,))])
+
+
+# Çalışma sürerken tick başına özetleri ekleme kipinde bir dosyaya akıtan gözlemci.
+# Kayıtlar sabit boyutlu bir tamponda (buffer_ticks satır) toplanır; tampon
+# dolunca yazıcı iş parçacığına verilir, simülasyon döngüsü diske yazmayı
+# beklemez. Yazıcı geride kalırsa en fazla `max_pending` tampon bekletilir,
+# fazlası atılır ve `dropped` sayacına eklenir (bellek sınırlı kalır).
+#   "jsonl"  -> her tick bir JSON satırı
+#   "binary" -> sabit boyutlu kayıtlar; çalıştırma başına bölümlerin başlangıçları ve
+#               kayıt düzenleri <path>.header.json dosyasında
+class TelemetrySink:
+    def __init__(self, path, format="jsonl", buffer_ticks=256, max_pending=8, every=1):
+        if format not in TELEMETRY_FORMATS:
+            raise ValueError(f"Unrecognized telemetry format {format!r}")
+        self.path = path
+        self.format = format
+        self.buffer_ticks = buffer_ticks
+        self.every = every  # kaç tick'te bir kayıt alınacağı
+        self.dropped = 0
+        self.written = 0
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._file = None
+        self._thread = None
+        self._buffer = None
+        self._size = 0
+
+    def on_start(self, sim):
+        self.dtype = record_dtype(len(sim.signals))
+        self._buffer = np.zeros(self.buffer_ticks, dtype=self.dtype)
+        self._size = 0
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            mode = "a" if self.format == "jsonl" else "ab"
+            self._file = open(self.path, mode, buffering=1024 * 1024)
+            self._thread = threading.Thread(target=self._writer, daemon=True)
+            self._thread.start()
+        if self.format == "binary":
+            # Her çalıştırma dosyada kendi kayıt düzeniyle bir bölüm açar (ör. tl1.py'de
+            # ikinci aşamada ışık sayısı, dolayısıyla `queues` genişliği değişir)
+            header_path = self.path + ".header.json"
+            offset = os.path.getsize(self.path)
+            segments = []
+            if offset and os.path.exists(header_path):
+                with open(header_path) as f:
+                    segments = json.load(f)["segments"]
+            segments.append({"offset": offset,
+                             "dtype": [list(field) for field in self.dtype.descr],
+                             "signals": [str(key) for key in sim.signals]})
+            with open(header_path, "w") as f:
+                json.dump({"segments": segments}, f)
+
+    def on_tick(self, sim):
+        if sim.tick % self.every:
+            return True
+        agents = sim.agents
+        active = ~agents.reached & (agents.next_node >= 0)
+        record = self._buffer[self._size]
+        record["tick"] = sim.tick
+        totals = sim.accumulator.totals
+        record["density"] = totals[-1] if len(totals) else 0
+        record["total_density"] = sim.accumulator.total
+        record["moving"] = np.count_nonzero(agents.moved)
+        record["stopped"] = np.count_nonzero(active & ~agents.moved)
+        record["reached"] = np.count_nonzero(agents.reached)
+        record["mean_stuck_steps"] = agents.stuck_steps.mean() if len(agents) else 0.0
+        if len(sim.signals) == len(record["queues"]):
+            record["queues"] = sim.queue_lengths()
+        self._size += 1
+        if self._size == self.buffer_ticks:
+            self._hand_off()
+        return True
+
+    # Kalan kayıtlar yazılır ve dosya kapanır; sonraki çalıştırmanın on_start'ı dosyayı
+    # ekleme kipinde yeniden açar
+    def on_finish(self, sim):
+        self.close()
+
+    # Dolu tamponu yazıcıya ver; yazıcı yetişemiyorsa tamponu at
+    def _hand_off(self):
+        if not self._size:
+            return
+        batch = self._buffer[:self._size].copy()
+        self._size = 0
+        try:
+            self._pending.put_nowait(batch)
+        except queue.Full:
+            self.dropped += len(batch)
+
+    def _writer(self):
+        while True:
+            batch = self._pending.get()
+            try:
+                if batch is None:
+                    return
+                if self.format == "jsonl":
+                    lines = []
+                    for row in batch.tolist():
+                        record = dict(zip(batch.dtype.names, row))
+                        record["queues"] = record["queues"].tolist()
+                        lines.append(json.dumps(record))
+                    self._file.write("\n".join(lines) + "\n")
+                else:
+                    self._file.write(batch.tobytes())
+                self._file.flush()
+                self.written += len(batch)
+            finally:
+                self._pending.task_done()
+
+    # Bekleyen tüm kayıtlar diske yazılana kadar bekle
+    def flush(self):
+        if self._thread is not None:
+            self._pending.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._hand_off()
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+            self._file.close()
+            self._file = None
+
+
+# İkili telemetri dosyasını çalıştırma başına birer kayıt dizisi olarak (sıfır kopya) aç
+def load_binary_telemetry(path):
+    with open(path + ".header.json") as f:
+        segments = json.load(f)["segments"]
+    ends = [segment["offset"] for segment in segments[1:]] + [os.path.getsize(path)]
+    runs = []
+    for segment, end in zip(segments, ends):
+        dtype = np.dtype([tuple(field) for field in segment["dtype"]])
+        count = (end - segment["offset"]) // dtype.itemsize
+        if not count:
+            runs.append(np.zeros(0, dtype=dtype))
+            continue
+        runs.append(np.memmap(path, dtype=dtype, mode="r", offset=segment["offset"], shape=(count,)))
+    return runs